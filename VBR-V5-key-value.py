@@ -1,3 +1,5 @@
+import sys
+
 # Define valid versions and modules
 valid_versions = {'2.2.2.3', '2.2.3.3', '2.3.3.0', '2.3.5.3', '2.3.7.6'}
 
@@ -38,6 +40,109 @@ modules = {
     }
 }
 
+
+# Marks a key a version drops from its base table; never a valid method name
+ROUTE_REMOVED = ''
+# Shared empty family table for versions the store does not hold
+NO_FAMILIES = {}
+
+
+class RouteRecord:
+    """Routes of one version and family: a base table shared across versions plus this version's changes to it."""
+
+    __slots__ = ('base', 'delta')
+
+    def __init__(self, base, delta=None):
+        self.base = base
+        self.delta = delta or None
+
+    def get(self, function_key, default=None):
+        if self.delta is not None:
+            function_name = self.delta.get(function_key)
+            if function_name is not None:
+                return function_name or default
+        return self.base.get(function_key, default)
+
+    def __contains__(self, function_key):
+        return self.get(function_key) is not None
+
+    def __getitem__(self, function_key):
+        function_name = self.get(function_key)
+        if function_name is None:
+            raise KeyError(function_key)
+        return function_name
+
+    def items(self):
+        delta = self.delta or {}
+        for function_key, function_name in self.base.items():
+            if function_key not in delta:
+                yield function_key, function_name
+        for function_key, function_name in delta.items():
+            if function_name != ROUTE_REMOVED:
+                yield function_key, function_name
+
+
+class RouteStore:
+    """Compact route tables: keys and method names are interned, and each version is stored as a delta against
+    the closest base table of its family, so versions that share routes share one dict. A version that matches
+    a base exactly, or becomes a base itself, is stored as that plain dict, so its lookups stay dict lookups."""
+
+    def __init__(self, max_delta=0.5):
+        # A table that differs from every base in more than max_delta of its routes becomes a new base
+        self.max_delta = max_delta
+        self._records = {}
+        self._bases = {}
+        # Bound straight to the dict, version checks run on every call
+        self.has_version = self._records.__contains__
+
+    @classmethod
+    def from_tables(cls, tables, **options):
+        store = cls(**options)
+        for version, families in tables.items():
+            for family, functions in families.items():
+                store.add(version, family, functions)
+        return store
+
+    def add(self, version, family, functions):
+        intern = sys.intern
+        routes = {intern(function_key): intern(function_name) for function_key, function_name in functions.items()}
+        family = intern(family)
+
+        base, delta = None, None
+        for candidate in self._bases.get(family, ()):
+            changes = {key: name for key, name in routes.items() if candidate.get(key) != name}
+            changes.update((key, ROUTE_REMOVED) for key in candidate if key not in routes)
+            if delta is None or len(changes) < len(delta):
+                base, delta = candidate, changes
+
+        if base is None or len(delta) > self.max_delta * max(len(routes), 1):
+            base, delta = routes, None
+            self._bases.setdefault(family, []).append(base)
+        record = base if not delta else RouteRecord(base, delta)
+        self._records.setdefault(intern(version), {})[family] = record
+
+    def versions(self):
+        return list(self._records)
+
+    def get_record(self, version, family):
+        return self._records.get(version, NO_FAMILIES).get(family)
+
+    def lookup(self, version, family, function_key):
+        record = self._records.get(version, NO_FAMILIES).get(family)
+        if record is None:
+            return None
+        return record.get(function_key)
+
+    def tables(self):
+        return {version: {family: dict(record.items()) for family, record in families.items()}
+                for version, families in self._records.items()}
+
+
+# Routes are served from the compact store built from the tables above. The tables are dropped
+# once it is built, so the store holds the only copy; edit the tables to change routing.
+route_store = RouteStore.from_tables(modules)
+del functions_v2_3_5_3, functions_v2_3_7_6, modules
+
 # Function to validate if the provided version is among the known versions
 def validate_version(version):
     if version not in valid_versions:
@@ -47,12 +152,11 @@ def validate_version(version):
 
 
 def try_import_module(version, family):
-    if version in modules:
-        module_dict = modules[version]
-        if family in module_dict:
-            return module_dict[family]
-        else:
-            raise ImportError(f"Family '{family}' not found in version '{version}'.")
+    record = route_store.get_record(version, family)
+    if record is not None:
+        return record
+    elif route_store.has_version(version):
+        raise ImportError(f"Family '{family}' not found in version '{version}'.")
     else:
         raise ImportError(f"Version '{version}' not found.")
 
@@ -1,4 +1,5 @@
-import inspect
+import types
+import weakref
 
 # Define valid versions and modules
 valid_versions = {'2.2.2.3', '2.2.3.3', '2.3.3.0', '2.3.5.3', '2.3.7.6'}
@@ -42,13 +43,27 @@ class UserAndRoles_v2_3_7_6:
 globals()['UserAndRoles_v2_3_5_3'] = UserAndRoles_v2_3_5_3
 globals()['UserAndRoles_v2_3_7_6'] = UserAndRoles_v2_3_7_6
 
-# Function to list all methods of a given class
+# Cache of the method names found per class
+defined_methods = weakref.WeakKeyDictionary()
+
+# Function to list all methods of a given class, reading the class __dict__s along the MRO
 def list_defined_methods(cls_obj):
-    methods = []
-    for name, obj in inspect.getmembers(cls_obj, inspect.isfunction):
-        if obj.__module__ == cls_obj.__module__:
-            methods.append(name)
-    return methods
+    methods = defined_methods.get(cls_obj)
+    if methods is None:
+        members = {}
+        for klass in cls_obj.__mro__:
+            for name, obj in vars(klass).items():
+                members.setdefault(name, obj)
+        methods = []
+        for name in sorted(members):
+            obj = members[name]
+            if isinstance(obj, staticmethod):
+                obj = obj.__func__
+            if isinstance(obj, types.FunctionType) and obj.__module__ == cls_obj.__module__:
+                methods.append(name)
+        methods = tuple(methods)
+        defined_methods[cls_obj] = methods
+    return list(methods)
 
 # Function to convert version from '2.3.5.3' to 'v2_3_5_3'
 def format_version(version):
@@ -1,3 +1,5 @@
+import bisect
+
 # Define valid versions and modules
 valid_versions = {'2.2.2.3', '2.2.3.3', '2.3.3.0', '2.3.5.3', '2.3.7.6'}
 
@@ -56,30 +58,81 @@ def try_import_module(version, family):
     else:
         raise ImportError(f"Version '{version}' not found.")
 
-# Function to filter methods to include only those containing the hint in their name
-def filter_methods_by_hint(methods_dict, hint):
-    # Initialize an empty list to hold methods that match the hint
-    matching_methods = []
+# Index over one family's method names for ranked hint lookups
+class MethodIndex:
+    def __init__(self, methods):
+        # Sorted names allow prefix lookups with a binary search
+        self.methods = sorted(set(methods))
+        self.names = set(self.methods)
+
+        # Suffixes starting at each '_' token boundary, e.g. 'user_ap_i' for 'add_user_ap_i'
+        self.token_suffixes = sorted(
+            (method[start:], method)
+            for method in self.methods
+            for start in [0] + [i + 1 for i, char in enumerate(method) if char == '_']
+        )
+        self.suffix_keys = [suffix for suffix, _ in self.token_suffixes]
+
+    # Function to rank matches: shorter names first, then alphabetical
+    @staticmethod
+    def rank(method):
+        return (len(method), method)
+
+    # Function to yield the positions of sorted keys that start with the hint
+    @staticmethod
+    def prefixed(keys, hint):
+        for index in range(bisect.bisect_left(keys, hint), len(keys)):
+            if not keys[index].startswith(hint):
+                break
+            yield index
 
-    # Iterate over each method name in the methods dictionary
-    for method in methods_dict:
-        # Check if the hint is present in the method name
-        if hint in method:
-            # If it is, add the method name to the list of matching methods
-            matching_methods.append(method)
+    # Function to yield candidate tiers: exact, name prefix, token prefix, substring
+    def tiers(self, hint):
+        yield [hint] if hint in self.names else []
+        yield [self.methods[index] for index in self.prefixed(self.methods, hint)]
+        yield {self.token_suffixes[index][1] for index in self.prefixed(self.suffix_keys, hint)}
+        # Only reached when no prefix matches, this is the one linear scan
+        yield [method for method in self.methods if hint in method]
 
-    # Return the list of methods that matched the hint
-    return matching_methods
+    # Function to return every method containing the hint, best match first
+    def search(self, hint):
+        ranked = []
+        seen = set()
+        for tier in self.tiers(hint):
+            for method in sorted(set(tier) - seen, key=self.rank):
+                ranked.append(method)
+                seen.add(method)
+        return ranked
+
+    # Function to return the best method for the hint, or None
+    def best(self, hint):
+        for tier in self.tiers(hint):
+            if tier:
+                return min(tier, key=self.rank)
+        return None
+
+# Method indexes built so far, keyed by (version, family)
+method_indexes = {}
+
+# Function to get the method index for a family, building it on first use
+def get_method_index(version, family):
+    key = (version, family)
+    if key not in method_indexes:
+        method_indexes[key] = MethodIndex(try_import_module(version, family))
+    return method_indexes[key]
+
+# Function to filter methods to include only those containing the hint in their name, best match first
+def filter_methods_by_hint(methods_dict, hint):
+    return MethodIndex(methods_dict).search(hint)
 
 # Function to check if a specific function exists in the methods dictionary
 def call_function(version, family, hint):
     if validate_version(version):
         try:
-            methods_dict = try_import_module(version, family)
-            methods = filter_methods_by_hint(methods_dict, hint)
+            method = get_method_index(version, family).best(hint)
 
-            if methods:
-                return methods[0]  # Return the matched function name
+            if method:
+                return method  # Return the matched function name
             else:
                 print(f"No matching function for hint '{hint}' in version '{version}'.")
                 return None
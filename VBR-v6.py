@@ -1,13 +1,764 @@
+import asyncio
+import bisect
+import hashlib
+import json
 import importlib  
-import inspect    
+import importlib.util
+import itertools
+import math
+import os
 import pkgutil    
+import threading
+import time
+import types
 import difflib    
+import heapq
+import weakref
+from collections import Counter, OrderedDict, defaultdict
+
+class RouteTable:
+    """
+    Bounded LRU table of resolved routes.
+
+    Maps a (version, family hint, function hint) triple to the name of the SDK
+    function it resolved to, so repeat lookups are a single dict access instead of
+    an import, a package walk and a fuzzy match.
+    """
+
+    def __init__(self, maxsize=1024):
+        """
+        Parameters:
+        maxsize (int): Maximum number of routes kept before the least recently used one is evicted.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._routes = OrderedDict()
+
+    def get(self, version, family, function_hint):
+        """
+        Looks up a resolved route.
+
+        Returns:
+        str or None: The resolved function name, or None if the route is not cached.
+        """
+        key = (version, family, function_hint)
+        try:
+            function_name = self._routes[key]
+        except KeyError:
+            self.misses += 1
+            return None
+
+        self._routes.move_to_end(key)  # Mark the route as most recently used
+        self.hits += 1
+        return function_name
+
+    def put(self, version, family, function_hint, function_name):
+        """
+        Stores a resolved route, evicting the least recently used one when full.
+        """
+        key = (version, family, function_hint)
+        self._routes[key] = function_name
+        self._routes.move_to_end(key)
+
+        if len(self._routes) > self.maxsize:
+            self._routes.popitem(last=False)
+
+    def invalidate(self, version=None, family=None):
+        """
+        Drops cached routes.
+
+        Parameters:
+        version (str, optional): Only drop routes for this API version.
+        family (str, optional): Only drop routes for this family hint.
+
+        Returns:
+        int: The number of routes removed.
+        """
+        if version is None and family is None:
+            removed = len(self._routes)
+            self._routes.clear()
+            return removed
+
+        stale = [
+            key for key in self._routes
+            if (version is None or key[0] == version) and (family is None or key[1] == family)
+        ]
+        for key in stale:
+            del self._routes[key]
+        return len(stale)
+
+    def stats(self):
+        """
+        Returns:
+        dict: Hit/miss counters and the current table size.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._routes),
+            "maxsize": self.maxsize,
+        }
+
+class FamilyMatcher:
+    """
+    Fuzzy matcher over the family names of one API version.
+
+    Returns exactly what difflib.get_close_matches would for the same arguments,
+    but is built once per version: shared character counts packed one field per
+    family into an integer give every family difflib's quick_ratio bound in a few
+    additions, candidates are scored best-bound first with a substring-based
+    ratio, and scoring stops once no remaining family can enter the top n.
+    Counts are packed on first use and results are memoized per query.
+    """
+
+    def __init__(self, families):
+        """
+        Parameters:
+        families (List[str]): The family names available in the API version.
+        """
+        self.families = list(families)
+        self._names = set(self.families)
+        self._lengths = [len(family) for family in self.families]
+        self._matches = {}
+
+        # Each family gets a field of whole bytes in one integer, wide enough that no shared count
+        # carries into the next field and the field's top bit is free
+        self._field_bytes = (max(self._lengths, default=0).bit_length() + 8) // 8
+        self._field_bits = self._field_bytes * 8
+        self._top_bits = self._pack([1 << (self._field_bits - 1)] * len(self.families))
+        self._shared = {}  # (character, count) -> packed shared counts
+        self._cutoff_offsets = {}  # (query length, cutoff) -> packed offsets
+
+    def _pack(self, values):
+        """
+        Packs one value per family into an integer.
+
+        Parameters:
+        values (List[int]): A value per family, in family order, each fitting its field.
+
+        Returns:
+        int: The integer holding values[i] in the i-th family's field.
+        """
+        if self._field_bytes == 1:
+            return int.from_bytes(bytes(values), 'little')
+        return int.from_bytes(b''.join(value.to_bytes(self._field_bytes, 'little') for value in values), 'little')
+
+    def _shared_counts(self, char, count):
+        """
+        Packs how many of a query character each family shares, built on first use.
+
+        Parameters:
+        char (str): A character of the query.
+        count (int): How often the query holds it.
+
+        Returns:
+        int: min(count, occurrences of char) in every family's field.
+        """
+        key = (char, count)
+        shared = self._shared.get(key)
+        if shared is None:
+            occurrences = map(str.count, self.families, itertools.repeat(char))
+            if self._field_bytes == 1:
+                # Cap every count at once with a translation table mapping x to min(x, count)
+                capped = bytes(range(count)) + bytes([count]) * (256 - count)
+                shared = int.from_bytes(bytes(occurrences).translate(capped), 'little')
+            else:
+                shared = self._pack([min(occurrence, count) for occurrence in occurrences])
+            self._shared[key] = shared
+        return shared
+
+    def _cutoff_offset(self, query_length, cutoff):
+        """
+        Packs, per family, 2 ** (field_bits - 1) less the fewest shared characters whose
+        quick_ratio bound reaches the cutoff, so adding it to the shared counts sets a
+        field's top bit exactly when the family's bound reaches the cutoff.
+
+        Parameters:
+        query_length (int): Length of the family name to match.
+        cutoff (float): Minimum similarity ratio in [0, 1].
+
+        Returns:
+        int: The packed offsets; 0 in the fields of families that cannot reach the cutoff.
+        """
+        key = (query_length, cutoff)
+        offset = self._cutoff_offsets.get(key)
+        if offset is None:
+            offsets = {}
+            for length in set(self._lengths):
+                total = length + query_length
+                if not total:
+                    needed = 0  # difflib rates two empty names 1.0
+                else:
+                    # Start just below the exact threshold and settle it with the comparison _candidates makes
+                    needed = max(0, math.ceil(cutoff * total / 2.0) - 1)
+                    while needed <= length and 2.0 * needed / total < cutoff:
+                        needed += 1
+                offsets[length] = (1 << (self._field_bits - 1)) - needed if needed <= length else 0
+            offset = self._cutoff_offsets[key] = self._pack(list(map(offsets.get, self._lengths)))
+        return offset
+
+    def _candidates(self, family, cutoff):
+        """
+        Lists the families whose quick_ratio upper bound reaches the cutoff.
+
+        Parameters:
+        family (str): The family name to match.
+        cutoff (float): Minimum similarity ratio in [0, 1].
+
+        Returns:
+        List[Tuple[float, str]]: (bound, family name) pairs, highest bound first.
+        """
+        shared_counts = 0
+        for char, count in Counter(family).items():
+            shared_counts += self._shared_counts(char, count)
+
+        query_length = len(family)
+        field_mask = (1 << self._field_bits) - 1
+        reached = (shared_counts + self._cutoff_offset(query_length, cutoff)) & self._top_bits
+        candidates = []
+        while reached:
+            top_bit = reached & -reached
+            reached ^= top_bit
+            index = top_bit.bit_length() // self._field_bits - 1
+            shared = (shared_counts >> (self._field_bits * index)) & field_mask
+            total = self._lengths[index] + query_length
+            candidates.append((2.0 * shared / total if total else 1.0, self.families[index]))
+        candidates.sort(reverse=True)
+        return candidates
+
+    @staticmethod
+    def _matching_characters(name, query):
+        """
+        Counts the characters difflib.SequenceMatcher(None, name, query) matches, for a
+        query under 200 characters, where difflib treats nothing as junk: the longest
+        common block, earliest in name and then in the query, then the same on either
+        side of it. Substring tests find each block in one pass over name.
+
+        Parameters:
+        name (str): A family name.
+        query (str): The family name to match.
+
+        Returns:
+        int: The sum of the sizes of the matching blocks.
+        """
+        matched = 0
+        ranges = [(0, len(name), 0, len(query))]
+        while ranges:
+            name_start, name_end, query_start, query_end = ranges.pop()
+            query_range = query[query_start:query_end]
+            block_start, block_size = name_start, 0
+            i = name_start
+            while i + block_size < name_end:
+                if name[i:i + block_size + 1] in query_range:
+                    block_start, block_size = i, block_size + 1
+                else:
+                    i += 1
+            if block_size:
+                matched += block_size
+                j = query_start + query_range.find(name[block_start:block_start + block_size])
+                if name_start < block_start and query_start < j:
+                    ranges.append((name_start, block_start, query_start, j))
+                if block_start + block_size < name_end and j + block_size < query_end:
+                    ranges.append((block_start + block_size, name_end, j + block_size, query_end))
+        return matched
+
+    def get_close_matches(self, family, n=3, cutoff=0.6):
+        """
+        Finds the best matching family names.
+        
+        Parameters:
+        family (str): The family name to find close matches for.
+        n (int): Maximum number of matches to return.
+        cutoff (float): Minimum similarity ratio in [0, 1].
+        
+        Returns:
+        List[str]: Up to n family names, best match first.
+        """
+        key = (family, n, cutoff)
+        if key in self._matches:
+            return self._matches[key]
+
+        # Only an identical name scores 1.0, so it is the single best match without scoring anything
+        if n == 1 and family in self._names:
+            self._matches[key] = [family]
+            return self._matches[key]
+
+        # difflib junks a query's popular characters from 200 characters on, so only shorter queries are scored here
+        query_length = len(family)
+        matcher = difflib.SequenceMatcher(None, '', family) if query_length >= 200 else None
+        best = []  # Min-heap of the top n (score, name) pairs
+        for bound, name in self._candidates(family, cutoff):
+            if len(best) == n and best[0][0] > bound:
+                break
+            if matcher is None:
+                total = len(name) + query_length
+                score = 2.0 * self._matching_characters(name, family) / total if total else 1.0
+            else:
+                matcher.set_seq1(name)
+                score = matcher.ratio()
+            if score < cutoff:
+                continue
+            if len(best) < n:
+                heapq.heappush(best, (score, name))
+            else:
+                heapq.heappushpop(best, (score, name))
+
+        matches = [name for _, name in sorted(best, reverse=True)]
+        self._matches[key] = matches
+        return matches
+
+    def best_match(self, family, cutoff=0.6):
+        """
+        Finds the single best matching family name.
+
+        Parameters:
+        family (str): The family name to find a match for.
+        cutoff (float): Minimum similarity ratio in [0, 1].
+
+        Returns:
+        str or None: The name difflib.get_close_matches would list first, or None.
+        """
+        matches = self.get_close_matches(family, 1, cutoff)
+        return matches[0] if matches else None
+
+class MethodIndex:
+    """
+    Ranked hint lookup over the methods of one family class.
+
+    A hint resolves to the shortest (then alphabetically first) method from the
+    first non-empty tier: exact name, name prefix, prefix of any '_' token, and
+    finally plain substring. The prefix tiers are binary searches over sorted
+    names and token suffixes; only the substring tier scans every method.
+    """
+
+    def __init__(self, methods):
+        """
+        Parameters:
+        methods (List[str]): The method names defined on the family class.
+        """
+        self.methods = sorted(set(methods))
+        self._names = set(self.methods)
+        self._best = {}
+
+        # Every suffix of a method name that starts at a token boundary, e.g. 'user_ap_i' for 'add_user_ap_i'
+        self._token_suffixes = sorted(
+            (method[start:], method)
+            for method in self.methods
+            for start in [0] + [i + 1 for i, char in enumerate(method) if char == '_']
+        )
+        self._suffix_keys = [suffix for suffix, _ in self._token_suffixes]
+
+    @staticmethod
+    def _rank(method):
+        return (len(method), method)
+
+    @staticmethod
+    def _prefixed(keys, hint):
+        """
+        Yields the positions of the sorted keys that start with the hint.
+        """
+        for index in range(bisect.bisect_left(keys, hint), len(keys)):
+            if not keys[index].startswith(hint):
+                break
+            yield index
+
+    def _tiers(self, hint):
+        yield [hint] if hint in self._names else []
+        yield [self.methods[index] for index in self._prefixed(self.methods, hint)]
+        yield {self._token_suffixes[index][1] for index in self._prefixed(self._suffix_keys, hint)}
+        yield [method for method in self.methods if hint in method]
+
+    def best(self, hint):
+        """
+        Finds the best matching method for a function hint.
+        
+        Parameters:
+        hint (str): The function hint.
+        
+        Returns:
+        str or None: The best matching method name, or None if no method contains the hint.
+        """
+        if hint not in self._best:
+            match = None
+            for tier in self._tiers(hint):
+                if tier:
+                    match = min(tier, key=self._rank)
+                    break
+            self._best[hint] = match
+
+        return self._best[hint]
+
+    def search(self, hint):
+        """
+        Lists every method containing the hint.
+        
+        Parameters:
+        hint (str): The function hint.
+        
+        Returns:
+        List[str]: The matching method names, best match first.
+        """
+        ranked = []
+        seen = set()
+        for tier in self._tiers(hint):
+            for method in sorted(set(tier) - seen, key=self._rank):
+                ranked.append(method)
+                seen.add(method)
+
+        return ranked
+
+def create_dnac_api(base_url, username, password, version, verify=True):
+    """
+    Connects a dnacentersdk API object, which holds one keep-alive HTTP session and auth token.
+
+    Returns:
+    DNACenterAPI: The connected SDK API object.
+    """
+    from dnacentersdk import api  # Imported on first connect so routing works without a controller
+
+    return api.DNACenterAPI(
+        base_url=base_url, username=username, password=password, version=version, verify=verify
+    )
+
+
+class ConnectionPool:
+    """
+    Process-wide pool of connected SDK API objects.
+
+    Connectors for the same controller, credentials and version share one API object, so its
+    HTTP session, TLS connection and auth token are reused across family calls instead of being
+    rebuilt per connector. Connections are rebuilt once their token is close to expiry.
+    """
+
+    def __init__(self, factory=create_dnac_api, token_ttl=3300):
+        """
+        Parameters:
+        factory (callable): Builds a connection from (base_url, username, password, version, verify).
+        token_ttl (float): Seconds a connection is reused before it is rebuilt with a fresh token;
+            the default stays under the controller's one-hour token lifetime.
+        """
+        self.factory = factory
+        self.token_ttl = token_ttl
+        self.connects = 0
+        self.reuses = 0
+        # _lock guards _connections, _key_locks and the counters; a key lock is held while connecting
+        self._connections = {}  # Key -> (connection, expiry time)
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def _key(self, base_url, username, password, version, verify):
+        # Only a digest of the password is kept in the pool's keys
+        digest = hashlib.sha256((password or "").encode("utf-8")).hexdigest()
+        return (base_url, username, digest, version, bool(verify))
+
+    def get(self, base_url, username, password, version, verify=True):
+        """
+        Returns a live connection for the controller, connecting or refreshing it if needed.
+
+        Returns:
+        object: The pooled connection built by the factory.
+        """
+        key = self._key(base_url, username, password, version, verify)
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Connecting is slow, so only callers for the same controller wait on each other
+        with key_lock:
+            with self._lock:
+                entry = self._connections.get(key)
+                if entry is not None and entry[1] > time.monotonic():
+                    self.reuses += 1
+                    return entry[0]
+
+            connection = self.factory(base_url, username, password, version, verify)
+            with self._lock:
+                replaced = self._connections.get(key)
+                self._connections[key] = (connection, time.monotonic() + self.token_ttl)
+                self.connects += 1
+
+        # Close the expired connection this one replaces, unless invalidate() already dropped it
+        if replaced is not None:
+            self._close(replaced[0])
+        return connection
+
+    @staticmethod
+    def _close(connection):
+        """Closes a connection's HTTP session, if it has a close method."""
+        close = getattr(connection, "close", None)
+        if callable(close):
+            close()
+
+    def invalidate(self, base_url=None):
+        """
+        Drops and closes pooled connections, e.g. after an authentication failure.
+
+        Parameters:
+        base_url (str, optional): Only drop connections to this controller.
+
+        Returns:
+        int: The number of connections removed.
+        """
+        with self._lock:
+            stale = [key for key in self._connections if base_url is None or key[0] == base_url]
+            dropped = [self._connections.pop(key)[0] for key in stale]
+        for connection in dropped:
+            self._close(connection)
+        return len(dropped)
+
+    def stats(self):
+        """
+        Returns:
+        dict: Connect/reuse counters and the current pool size.
+        """
+        with self._lock:
+            return {
+                "connects": self.connects,
+                "reuses": self.reuses,
+                "size": len(self._connections),
+            }
+
+
+connection_pool = ConnectionPool()
+
+
+class _NullSpan:
+    """Context manager that does nothing, shared by every no-op span."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+class NullInstrumentation:
+    """
+    Default instrumentation: every hook is a no-op.
+
+    span() hands back one shared context manager, so an uninstrumented hot path pays
+    a method call and an empty with-block, and nothing is allocated or recorded.
+    """
+
+    _span = _NullSpan()
+
+    def span(self, name, family=None):
+        return self._span
+
+    def count(self, name, family=None, value=1):
+        pass
+
+    def observe(self, name, seconds, family=None):
+        pass
+
+
+NULL_INSTRUMENTATION = NullInstrumentation()
+
+
+class _Span:
+    """Times one stage and records it in an Instrumentation histogram on exit."""
+    __slots__ = ("instrumentation", "name", "family", "started")
+
+    def __init__(self, instrumentation, name, family):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.family = family
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.instrumentation.observe(self.name, time.perf_counter() - self.started, self.family)
+        return False
+
+
+class Instrumentation:
+    """
+    Records stage timings and cache counters for the router and connectors.
+
+    Spans feed per-(stage, family) latency histograms; counters track cache hits and misses.
+    The recorded metrics are written out with export(), as JSON or Prometheus text.
+    """
+
+    # Histogram bucket upper bounds, in seconds
+    BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+    def __init__(self, prefix="vbr"):
+        """
+        Parameters:
+        prefix (str): Prefix for the exported metric names.
+        """
+        self.prefix = prefix
+        self.counters = defaultdict(int)  # (name, family) -> count
+        self.histograms = {}  # (name, family) -> [bucket counts..., total seconds, observations]
+        self._lock = threading.Lock()
+
+    def span(self, name, family=None):
+        """
+        Returns a context manager that times the enclosed stage.
+        """
+        return _Span(self, name, family)
+
+    def count(self, name, family=None, value=1):
+        """
+        Increments a counter.
+        """
+        with self._lock:
+            self.counters[(name, family)] += value
+
+    def observe(self, name, seconds, family=None):
+        """
+        Records one duration in a stage's latency histogram.
+        """
+        position = bisect.bisect_left(self.BUCKETS, seconds)
+        with self._lock:
+            histogram = self.histograms.get((name, family))
+            if histogram is None:
+                histogram = self.histograms[(name, family)] = [0] * (len(self.BUCKETS) + 1) + [0.0, 0]
+            histogram[position] += 1
+            histogram[-2] += seconds
+            histogram[-1] += 1
+
+    def snapshot(self):
+        """
+        Returns:
+        dict: The counters and histograms, with cumulative bucket counts keyed by upper bound.
+        """
+        with self._lock:
+            counters = [
+                {"name": name, "family": family, "value": value}
+                for (name, family), value in sorted(self.counters.items(), key=lambda item: str(item[0]))
+            ]
+            histograms = []
+            for (name, family), histogram in sorted(self.histograms.items(), key=lambda item: str(item[0])):
+                cumulative, buckets = 0, {}
+                for bound, observations in zip(self.BUCKETS + ("+Inf",), histogram):
+                    cumulative += observations
+                    buckets[str(bound)] = cumulative
+                histograms.append({"name": name, "family": family, "buckets": buckets,
+                                   "sum": histogram[-2], "count": histogram[-1]})
+        return {"counters": counters, "histograms": histograms}
+
+    def to_prometheus(self):
+        """
+        Returns:
+        str: The metrics in the Prometheus text exposition format.
+        """
+        def labels(family, **extra):
+            pairs = ([("family", family)] if family is not None else []) + sorted(extra.items())
+            if not pairs:
+                return ""
+            return "{" + ",".join('{}="{}"'.format(key, str(value).replace('"', '\\"')) for key, value in pairs) + "}"
+
+        snapshot = self.snapshot()
+        lines, typed = [], set()
+        for counter in snapshot["counters"]:
+            metric = "{}_{}_total".format(self.prefix, counter["name"])
+            if metric not in typed:
+                lines.append("# TYPE {} counter".format(metric))
+                typed.add(metric)
+            lines.append("{}{} {}".format(metric, labels(counter["family"]), counter["value"]))
+        for histogram in snapshot["histograms"]:
+            metric = "{}_{}_seconds".format(self.prefix, histogram["name"])
+            if metric not in typed:
+                lines.append("# TYPE {} histogram".format(metric))
+                typed.add(metric)
+            for bound, observations in histogram["buckets"].items():
+                lines.append("{}_bucket{} {}".format(metric, labels(histogram["family"], le=bound), observations))
+            lines.append("{}_sum{} {}".format(metric, labels(histogram["family"]), histogram["sum"]))
+            lines.append("{}_count{} {}".format(metric, labels(histogram["family"]), histogram["count"]))
+        return "\n".join(lines) + "\n"
+
+    def export(self, path):
+        """
+        Writes the metrics to a local file: JSON for a .json path, Prometheus text otherwise.
+        
+        Parameters:
+        path (str): The file to write.
+        """
+        with open(path, "w") as export_file:
+            if path.endswith(".json"):
+                json.dump(self.snapshot(), export_file, indent=2)
+            else:
+                export_file.write(self.to_prometheus())
+
+
+_defined_methods = weakref.WeakKeyDictionary()  # Class -> tuple of its defined method names
+
+
+def scan_defined_methods(cls_obj):
+    """
+    Lists the functions of a class that were defined in the class's own module, sorted by name.
+
+    Returns the same names as filtering inspect.getmembers(cls_obj) with inspect.isfunction and
+    __module__, but reads each class __dict__ along the MRO instead of resolving every attribute
+    through getattr. Results are cached per class, so classes are assumed not to change after
+    their first scan, as with the SDK's generated family classes.
+    
+    Parameters:
+    cls_obj (type): The class object whose methods are to be listed.
+    
+    Returns:
+    List[str]: A list of method names.
+    """
+    methods = _defined_methods.get(cls_obj)
+    if methods is None:
+        members = {}
+        for klass in cls_obj.__mro__:
+            for name, obj in vars(klass).items():
+                members.setdefault(name, obj)  # The first class in the MRO wins, as with getattr
+
+        methods = []
+        for name in sorted(members):
+            obj = members[name]
+            if isinstance(obj, staticmethod):
+                obj = obj.__func__  # getattr unwraps static methods to plain functions
+            if isinstance(obj, types.FunctionType) and obj.__module__ == cls_obj.__module__:
+                methods.append(name)
+
+        methods = tuple(methods)
+        _defined_methods[cls_obj] = methods
+
+    return list(methods)
+
+
+def scan_class_names(module):
+    """
+    Lists the classes defined in a module, sorted by name, reading the module __dict__ directly.
+    
+    Parameters:
+    module (module): The module to scan.
+    
+    Returns:
+    List[str]: A list of class names.
+    """
+    return sorted(
+        name for name, obj in vars(module).items()
+        if isinstance(obj, type) and obj.__module__ == module.__name__
+    )
+
 
 class VersionBasedRouting:
     class VersionError(Exception):
         """Exception raised for invalid DNA Center API versions."""
         pass
 
+    def __init__(self, route_table=None, instrumentation=None):
+        """
+        Parameters:
+        route_table (RouteTable, optional): Table used to memoize resolved routes.
+        instrumentation (Instrumentation, optional): Receives stage timings and cache counters;
+            defaults to the no-op NULL_INSTRUMENTATION.
+        """
+        self.route_table = route_table if route_table is not None else RouteTable()
+        self.instrumentation = instrumentation if instrumentation is not None else NULL_INSTRUMENTATION
+        self._family_matchers = {}  # Version -> FamilyMatcher
+        self._module_cache = {}  # Version -> {family name: imported family module}
+        self._method_indexes = {}  # Family class -> MethodIndex
+        self._callables = weakref.WeakKeyDictionary()  # API object -> {(version, family, hint): bound method}
+
     def list_defined_methods(self, cls_obj):
         """
         Lists all methods of a given class.
@@ -18,18 +769,8 @@ class VersionBasedRouting:
         Returns:
         List[str]: A list of method names.
         """
-        methods = []  # Initialize an empty list to store method names
-
-        # Get all members (functions, classes, etc.) of the class
-        members = inspect.getmembers(cls_obj)
-
-        # Iterate through each member
-        for name, obj in members:
-            # Check if the member is a function and belongs to the class's module
-            if inspect.isfunction(obj) and obj.__module__ == cls_obj.__module__:
-                methods.append(name)  # Add the method name to the list
-
-        return methods  # Return the list of method names
+        with self.instrumentation.span("list_defined_methods", cls_obj.__name__):
+            return scan_defined_methods(cls_obj)
 
     def format_version(self, version):
         """
@@ -63,36 +804,80 @@ class VersionBasedRouting:
                 '2.2.2.3, 2.2.3.3, 2.3.3.0, 2.3.5.3, and 2.3.7.6'
             )
 
-    def find_closest_family(self, module, family):
+    def get_version_path(self, version):
+        """
+        Locates the package directory of an API version without importing it.
+        
+        Parameters:
+        version (str): The API version.
+        
+        Returns:
+        str: The directory holding the version's family modules.
+        
+        Raises:
+        ImportError: If dnacentersdk or the version package cannot be found.
+        """
+        formatted_version = self.format_version(version)
+
+        # find_spec on the top-level package reads its location without executing it
+        spec = importlib.util.find_spec("dnacentersdk")
+        if spec is None or not spec.submodule_search_locations:
+            raise ImportError("No module named 'dnacentersdk'")
+
+        for location in spec.submodule_search_locations:
+            version_path = os.path.join(location, "api", formatted_version)
+            if os.path.isdir(version_path):
+                return version_path
+
+        raise ImportError(f"No module named 'dnacentersdk.api.{formatted_version}'")
+
+    def get_family_matcher(self, version):
+        """
+        Returns the family matcher for an API version, building it on first use.
+
+        Families are listed from the version's directory, so no family module is imported.
+        
+        Parameters:
+        version (str): The API version.
+        
+        Returns:
+        FamilyMatcher: The matcher over the version's family names.
+        """
+        matcher = self._family_matchers.get(version)
+        if matcher is None:
+            version_path = self.get_version_path(version)
+            available_families = [name for _, name, _ in pkgutil.iter_modules([version_path])]
+            matcher = FamilyMatcher(available_families)
+            self._family_matchers[version] = matcher
+
+        return matcher
+
+    def find_closest_family(self, version, family):
         """
         Finds the closest matching family name from available modules.
         
         Parameters:
-        module (module): The base module for the API version.
+        version (str): The API version whose families are searched.
         family (str): The family name to find close matches for.
         
         Returns:
         str or None: The closest matching family name or None if no match is found.
         """
-        available_families = []  # Initialize an empty list for available family names
+        with self.instrumentation.span("find_closest_family", family):
+            matcher = self.get_family_matcher(version)
 
-        # Iterate over all submodules in the module's path
-        for _, name, _ in pkgutil.iter_modules(module.__path__):
-            available_families.append(name)  # Add each submodule name to the list
-
-        # Find close matches for the given family name
-        closest_matches = difflib.get_close_matches(family, available_families)
-        print(available_families)
+            # Find the closest match for the given family name, None if nothing is close enough
+            closest_match = matcher.best_match(family)
+        print(matcher.families)
         print()
-        # Return the closest match if found, otherwise return None
-        if closest_matches:
-            return closest_matches[0]
-        
-        return None
+        return closest_match
 
     def try_import_module(self, version, family):
         """
         Attempts to import a module dynamically based on the family name and version.
+
+        Only the matched family submodule is imported, once per version; later calls
+        return the cached module.
         
         Parameters:
         version (str): The API version to import.
@@ -107,22 +892,128 @@ class VersionBasedRouting:
         formatted_version = self.format_version(version)  # Format the version string
         module_path = f"dnacentersdk.api.{formatted_version}"  # Construct the module path
 
-        try:
-            # Import the base module for the version
-            base_module = importlib.import_module(module_path)
+        with self.instrumentation.span("try_import_module", family):
+            try:
+                # Find the closest matching family name from the version's file listing
+                family_name = self.find_closest_family(version, family)
             
-            # Find the closest matching family name
-            family_name = self.find_closest_family(base_module, family)
-            
-            if family_name:
-                # Construct the path for the submodule and import it
-                submodule_path = f"{module_path}.{family_name}"
-                submodule = importlib.import_module(submodule_path)
-                return submodule
-            else:
-                raise ImportError(f"Module for family '{family}' not found in version '{version}'.")
-        except ImportError as e:
-            raise ImportError(f"Module for version '{version}' not found: {e}")
+                if family_name:
+                    version_modules = self._module_cache.setdefault(version, {})
+                    submodule = version_modules.get(family_name)
+                    if submodule is None:
+                        # Construct the path for the submodule and import it
+                        submodule_path = f"{module_path}.{family_name}"
+                        submodule = importlib.import_module(submodule_path)
+                        version_modules[family_name] = submodule
+                    return submodule
+                else:
+                    raise ImportError(f"Module for family '{family}' not found in version '{version}'.")
+            except ImportError as e:
+                raise ImportError(f"Module for version '{version}' not found: {e}")
+
+    def get_family_class(self, module):
+        """
+        Finds the first class defined in a family module.
+        
+        Parameters:
+        module (module): The imported family submodule.
+        
+        Returns:
+        type or None: The family class, or None if the module defines no class.
+        """
+        class_names = scan_class_names(module)
+        if class_names:
+            return getattr(module, class_names[0])
+
+        return None
+
+    def get_method_index(self, family_class):
+        """
+        Returns the method index for a family class, building it on first use.
+        
+        Parameters:
+        family_class (type): The SDK family class.
+        
+        Returns:
+        MethodIndex: The index over the class's defined methods.
+        """
+        index = self._method_indexes.get(family_class)
+        if index is None:
+            index = MethodIndex(self.list_defined_methods(family_class))
+            self._method_indexes[family_class] = index
+
+        return index
+
+    def resolve_route(self, version, family, function_hint):
+        """
+        Resolves a family and function hint to the name of an SDK function.
+        
+        Parameters:
+        version (str): The API version.
+        family (str): The family hint for the submodule.
+        function_hint (str): The function hint to match against the family's methods.
+        
+        Returns:
+        str or None: The matched function name, or None if nothing matches.
+        
+        Raises:
+        ImportError: If the module or submodule cannot be imported.
+        """
+        function_name = self.route_table.get(version, family, function_hint)
+        if function_name is not None:
+            self.instrumentation.count("route_cache_hits", family)
+            return function_name
+        self.instrumentation.count("route_cache_misses", family)
+
+        module = self.try_import_module(version, family)
+        family_class = self.get_family_class(module)
+        if family_class is None:
+            return None
+
+        # Match the function hint with available methods
+        function_name = self.get_method_index(family_class).best(function_hint)
+        if function_name is None:
+            return None
+
+        self.route_table.put(version, family, function_hint, function_name)
+        return function_name
+
+    def resolve_callable(self, api, version, family, function_hint):
+        """
+        Resolves a family and function hint to a bound method on an SDK API object.
+
+        The bound method is cached per API object and route, so repeated calls skip both the
+        route lookup and the family/function getattr chain.
+        
+        Parameters:
+        api (DNACenterAPI): The connected SDK API object.
+        version (str): The API version.
+        family (str): The family hint for the submodule.
+        function_hint (str): The function hint to match against the family's methods.
+        
+        Returns:
+        callable or None: The bound SDK method, or None if nothing matches.
+        
+        Raises:
+        ImportError: If the module or submodule cannot be imported.
+        """
+        key = (version, family, function_hint)
+        bound = self._callables.setdefault(api, {})
+        method = bound.get(key)
+        if method is not None:
+            self.instrumentation.count("callable_cache_hits", family)
+            return method
+        self.instrumentation.count("callable_cache_misses", family)
+
+        function_name = self.resolve_route(version, family, function_hint)
+        if function_name is None:
+            return None
+
+        # The API object exposes each family under its submodule name
+        family_name = self.try_import_module(version, family).__name__.rsplit('.', 1)[-1]
+        method = getattr(getattr(api, family_name), function_name)
+        bound[key] = method
+        return method
 
     def inspect_family_file(self, version, family):
         """
@@ -140,17 +1031,8 @@ class VersionBasedRouting:
             module = self.try_import_module(version, family)
             print(f"Successfully imported {module.__name__}")
 
-            # Get all members of the module
-            members = inspect.getmembers(module)
-            
-            # Initialize an empty list for class names
-            class_names = []
-            
-            # Iterate through each member
-            for name, obj in members:
-                # Check if the member is a class and belongs to the current module
-                if inspect.isclass(obj) and obj.__module__ == module.__name__:
-                    class_names.append(name)
+            # Get the names of the classes defined in the module
+            class_names = scan_class_names(module)
 
             if class_names:
                 # Use the first class as default if any classes are found
@@ -171,7 +1053,8 @@ class VersionBasedRouting:
             print(e)
 
 class DNACConnector:
-    def __init__(self, version, family_hint, function_hint):
+    def __init__(self, version, family_hint, function_hint, api=None, credentials=None, pool=None,
+                 instrumentation=None):
         """
         Initializes the DNACConnector with version, family hint, and function hint.
         
@@ -179,11 +1062,23 @@ class DNACConnector:
         version (str): The API version.
         family_hint (str): The family hint to locate the relevant submodule.
         function_hint (str): The function hint to locate the relevant method.
+        api (DNACenterAPI, optional): A connected SDK API object; when given, calls go
+            straight to its bound methods instead of through the string-dispatch executor.
+        credentials (dict, optional): base_url, username, password and verify for a pooled
+            connection, used when no api is given.
+        pool (ConnectionPool, optional): Pool to take the connection from; defaults to the
+            process-wide connection_pool.
+        instrumentation (Instrumentation, optional): Receives routing stage timings, cache
+            counters and per-family DNAC call latencies.
         """
         self.version = version
         self.family_hint = family_hint
         self.function_hint = function_hint
-        self.version_based_routing = VersionBasedRouting()
+        if api is None and credentials is not None:
+            api = (pool if pool is not None else connection_pool).get(version=version, **credentials)
+        self.api = api
+        self.instrumentation = instrumentation if instrumentation is not None else NULL_INSTRUMENTATION
+        self.version_based_routing = VersionBasedRouting(instrumentation=self.instrumentation)
         self.dnac = self.connect_to_dnac()  # Establish connection
 
     def connect_to_dnac(self):
@@ -207,47 +1102,171 @@ class DNACConnector:
         dict: The response from the DNAC API.
         """
         try:
-            # Import the relevant module dynamically
-            module = self.version_based_routing.try_import_module(self.version, self.family_hint)
-            print(f"Successfully imported {module.__name__}")
-
-            # Find the family class
-            members = inspect.getmembers(module)
-            family_class_name = None
-            
-            for name, obj in members:
-                if inspect.isclass(obj) and obj.__module__ == module.__name__:
-                    family_class_name = name
-                    break
-            
-            family_class = getattr(module, family_class_name, None) if family_class_name else None
+            if self.api is not None:
+                # Call the bound SDK method directly, cached after the first call
+                method = self.version_based_routing.resolve_callable(
+                    self.api, self.version, self.family_hint, self.function_hint
+                )
+                if method is None:
+                    print(f"No matching function for hint '{self.function_hint}' in version '{self.version}'.")
+                    return None
+                with self.instrumentation.span("dnac_call", self.family_hint):
+                    return method(invoke_source="external")
 
-            if family_class:
-                # List all defined methods in the class
-                methods = self.version_based_routing.list_defined_methods(family_class)
-                
-                # Match the function hint with available methods
-                matching_methods = [method for method in methods if self.function_hint in method]
+            # Resolve the function name, served from the route table after the first call
+            function_name = self.version_based_routing.resolve_route(
+                self.version, self.family_hint, self.function_hint
+            )
 
-                if matching_methods:
-                    # Print the matched function name
-                    print(f"Matched function: {matching_methods[0]}")
-                    # Use the dynamic values in the execution
+            if function_name:
+                # Print the matched function name
+                print(f"Matched function: {function_name}")
+                # Use the dynamic values in the execution
+                with self.instrumentation.span("dnac_call", self.family_hint):
                     response = self.dnac(
                         family=self.family_hint,
-                        function=matching_methods[0],
+                        function=function_name,
                         op_modifies=True,
                         params={"invoke_source": "external"},
                     )
-                    # print(matching_methods[0])
-                    return response
-                else:
-                    print(f"No matching function for hint '{self.function_hint}' in version '{self.version}'.")
+                return response
             else:
-                print(f"Class for family '{self.family_hint}' not found.")
+                print(f"No matching function for hint '{self.function_hint}' in version '{self.version}'.")
         except ImportError as e:
             print(f"ImportError: {e}")
 
+class AsyncDNACConnector:
+    """
+    asyncio connector that runs family calls concurrently against one controller.
+
+    Routes are resolved once per (family hint, function hint) and shared by every call;
+    the blocking route resolution and SDK calls run in an executor, with at most
+    max_concurrency calls in flight. An instance is meant to be used from one event loop.
+    """
+
+    def __init__(self, version, api=None, credentials=None, pool=None, max_concurrency=8, executor=None,
+                 instrumentation=None):
+        """
+        Parameters:
+        version (str): The API version.
+        api (DNACenterAPI, optional): A connected SDK API object.
+        credentials (dict, optional): base_url, username, password and verify for a pooled
+            connection, used when no api is given.
+        pool (ConnectionPool, optional): Pool to take the connection from; defaults to the
+            process-wide connection_pool.
+        max_concurrency (int): Maximum number of SDK calls in flight at once.
+        executor (concurrent.futures.Executor, optional): Executor for blocking work; defaults
+            to the event loop's default executor.
+        instrumentation (Instrumentation, optional): Receives routing stage timings, cache
+            counters and per-family DNAC call latencies.
+        """
+        self.version = version
+        if api is None and credentials is not None:
+            api = (pool if pool is not None else connection_pool).get(version=version, **credentials)
+        self.api = api
+        self.max_concurrency = max_concurrency
+        self.executor = executor
+        self.instrumentation = instrumentation if instrumentation is not None else NULL_INSTRUMENTATION
+        self.version_based_routing = VersionBasedRouting(instrumentation=self.instrumentation)
+        self.dnac = self.connect_to_dnac()
+        self._routes = {}  # (family hint, function hint) -> future of the resolved call target
+        self._resolve_lock = threading.Lock()  # VersionBasedRouting is not thread-safe
+        self._semaphore = None  # Created on first call, inside the running event loop
+
+    def connect_to_dnac(self):
+        """
+        Creates a mock connection to the DNAC, used when no api is given.
+        
+        Returns:
+        function: A mock function to simulate the DNAC API execution.
+        """
+        def _exec(family, function, op_modifies, params):
+            print(f"Executing {function} in family {family}")
+            return {"status": "success"}
+
+        return _exec
+
+    def _resolve(self, family_hint, function_hint):
+        """
+        Resolves a route to a function that takes the call's params, or None if nothing matches.
+        """
+        with self._resolve_lock:
+            if self.api is not None:
+                method = self.version_based_routing.resolve_callable(
+                    self.api, self.version, family_hint, function_hint
+                )
+                if method is None:
+                    return None
+                return lambda params: method(**params)
+
+            function_name = self.version_based_routing.resolve_route(self.version, family_hint, function_hint)
+            if function_name is None:
+                return None
+            return lambda params: self.dnac(
+                family=family_hint, function=function_name, op_modifies=True, params=params
+            )
+
+    async def _route(self, family_hint, function_hint):
+        loop = asyncio.get_running_loop()
+        key = (family_hint, function_hint)
+        future = self._routes.get(key)
+        if future is None:
+            # Concurrent calls for the same route wait on a single resolution
+            future = loop.run_in_executor(self.executor, self._resolve, family_hint, function_hint)
+            self._routes[key] = future
+        try:
+            return await future
+        except Exception:
+            # A failed resolution is not cached, so the next call for the route retries it
+            if self._routes.get(key) is future:
+                del self._routes[key]
+            raise
+
+    async def call(self, family_hint, function_hint, params=None):
+        """
+        Calls the SDK function matching a family and function hint.
+        
+        Parameters:
+        family_hint (str): The family hint to locate the relevant submodule.
+        function_hint (str): The function hint to locate the relevant method.
+        params (dict, optional): Keyword arguments for the SDK function.
+        
+        Returns:
+        dict or None: The response from the DNAC API, or None if no function matches.
+        
+        Raises:
+        ImportError: If the module or submodule cannot be imported.
+        """
+        target = await self._route(family_hint, function_hint)
+        if target is None:
+            print(f"No matching function for hint '{function_hint}' in version '{self.version}'.")
+            return None
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, self._timed_call, family_hint, target, params or {})
+
+    def _timed_call(self, family_hint, target, params):
+        with self.instrumentation.span("dnac_call", family_hint):
+            return target(params)
+
+    async def gather(self, calls, return_exceptions=False):
+        """
+        Runs a batch of calls concurrently.
+        
+        Parameters:
+        calls (Iterable[tuple]): (family_hint, function_hint) or (family_hint, function_hint, params) tuples.
+        return_exceptions (bool): Return exceptions in place of results instead of raising the first one.
+        
+        Returns:
+        List: The responses, in the order of calls.
+        """
+        return await asyncio.gather(
+            *(self.call(*call) for call in calls), return_exceptions=return_exceptions
+        )
+
 # Example usage
 if __name__ == "__main__":
     # Initialize the DNAC connector with version, family hint, and function hint
@@ -0,0 +1,126 @@
+"""
+Checks and times VBR-v6's AsyncDNACConnector against a mock controller.
+
+Issues a batch of user family calls (users, roles, permissions, external servers and
+more) through one pooled DNACenterAPI with AsyncDNACConnector.gather, and checks that:
+- the responses equal those of the same calls made one by one
+- the mock controller never served more than max_concurrency of them at once
+- a route whose resolution failed is not cached, so the next call for it succeeds
+It then reports the batch's wall time at max_concurrency 1 and at --concurrency.
+
+Usage:
+    python benchmarks/bench_async_connector.py [--calls 24] [--concurrency 4] [--latency 0.05]
+"""
+import argparse
+import asyncio
+import contextlib
+import importlib.util
+import io
+import os
+import sys
+import time
+import warnings
+
+from mock_controller import MockController
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+VERSION = "2.3.7.6"
+
+# Function hints of the user family's read calls, with their params
+CALLS = [
+    ("get_users", {"invoke_source": "external"}),
+    ("get_roles", {}),
+    ("get_permissions", {}),
+    ("get_external_authentication_servers", {"invoke_source": "external"}),
+    ("get_external_authentication_setting", {}),
+    ("get_aaa_attribute", {}),
+]
+
+
+def load_script(name, relative_path):
+    """Loads a repo script as a module with its stdout suppressed."""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(REPO_DIR, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    with contextlib.redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(module)
+    return module
+
+
+def batch(count):
+    """Returns count (family_hint, function_hint, params) calls cycling through CALLS."""
+    return [("user role",) + CALLS[index % len(CALLS)] for index in range(count)]
+
+
+async def run_batch(v6, api, calls, concurrency):
+    connector = v6.AsyncDNACConnector(VERSION, api=api, max_concurrency=concurrency)
+    return await connector.gather(calls)
+
+
+async def check_eviction(v6, api):
+    """Returns True if a failed route resolution is retried instead of cached."""
+    connector = v6.AsyncDNACConnector(VERSION, api=api)
+    resolve = connector._resolve
+    failures = []
+
+    def flaky_resolve(family_hint, function_hint):
+        if not failures:
+            failures.append(function_hint)
+            raise RuntimeError("simulated resolution failure")
+        return resolve(family_hint, function_hint)
+
+    connector._resolve = flaky_resolve
+    try:
+        await connector.call("user role", "get_roles")
+        return False
+    except RuntimeError:
+        pass
+    response = await connector.call("user role", "get_roles")
+    return bool(response and response.get("response"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and time AsyncDNACConnector on a mock controller.")
+    parser.add_argument("--calls", type=int, default=24, help="Calls per batch")
+    parser.add_argument("--concurrency", type=int, default=4, help="max_concurrency of the concurrent run")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds the mock delays each API request")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    v6 = load_script("bench_vbr_v6", "VBR-v6.py")
+    failures = []
+    with MockController(users=100, latency=args.latency) as controller:
+        credentials = {"base_url": controller.url, "username": "admin", "password": "admin", "verify": False}
+        api = v6.ConnectionPool().get(version=VERSION, **credentials)
+        calls = batch(args.calls)
+        with contextlib.redirect_stdout(io.StringIO()):
+            # Resolves every route and logs in once, outside the measurements
+            expected = asyncio.run(run_batch(v6, api, calls, 1))
+
+            timings = {}
+            for concurrency in (1, args.concurrency):
+                controller.stats.pop("peak_in_flight", None)
+                started = time.perf_counter()
+                responses = asyncio.run(run_batch(v6, api, calls, concurrency))
+                timings[concurrency] = (time.perf_counter() - started, controller.stats.get("peak_in_flight", 0))
+                if responses != expected:
+                    failures.append("responses at max_concurrency={} differ from the serial run".format(concurrency))
+                if timings[concurrency][1] > concurrency:
+                    failures.append("{} calls in flight at max_concurrency={}".format(timings[concurrency][1], concurrency))
+
+            if not asyncio.run(check_eviction(v6, api)):
+                failures.append("a failed route resolution was cached")
+
+    print("{} calls, {:.0f} ms latency per call".format(args.calls, args.latency * 1000))
+    for concurrency, (seconds, peak) in timings.items():
+        print("  max_concurrency={:<3}: {:8.1f} ms, peak {} in flight".format(concurrency, seconds * 1000, peak))
+    print("  speedup: {:.1f}x".format(timings[1][0] / timings[args.concurrency][0]))
+    for failure in failures:
+        print("FAILED: " + failure)
+    if not failures:
+        print("Responses match the serial run, concurrency stays capped, failed routes are retried")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""
+Benchmarks DNACConnector requests per second with and without the ConnectionPool, on a mock controller.
+
+Every request builds a VBR-v6 DNACConnector for the user family and calls get_user, as a
+caller creating one connector per operation would:
+- unpooled: each connector gets its own new DNACenterAPI, so every request pays for building
+  the SDK's family objects, a token request and a new TLS connection
+- pooled: each connector takes its API object from a ConnectionPool, so the token and the
+  keep-alive session are shared
+Both run sequentially and from a thread pool. The mock controller delays token requests
+by --token-latency and every other request by --latency, standing in for a remote controller.
+It runs in the benchmark's own process, so threaded numbers share one GIL with the server.
+
+Usage:
+    python benchmarks/bench_connection_pool.py [--requests 50] [--threads 8] [--latency 0.005] [--token-latency 0.05]
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import os
+import sys
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+from mock_controller import MockController
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+VERSION = "2.3.7.6"
+
+
+def load_script(name, relative_path):
+    """Loads a repo script as a module with its stdout suppressed."""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(REPO_DIR, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    with contextlib.redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(module)
+    return module
+
+
+def make_request(v6, credentials, pool):
+    """Returns a function that issues one get_user request through a new DNACConnector."""
+    def request(_):
+        if pool is None:
+            api = v6.create_dnac_api(version=VERSION, **credentials)
+            connector = v6.DNACConnector(VERSION, "user role", "get_users", api=api)
+        else:
+            connector = v6.DNACConnector(VERSION, "user role", "get_users", credentials=credentials, pool=pool)
+        response = connector.get_user()
+        if not response or "users" not in response.get("response", {}):
+            raise RuntimeError("get_user returned {!r}".format(response))
+    return request
+
+
+def run(controller, request, requests, threads):
+    """Returns (requests per second, connections opened, token requests) for one workload."""
+    before = dict(controller.stats)
+    started = time.perf_counter()
+    if threads == 1:
+        for index in range(requests):
+            request(index)
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(request, range(requests)))
+    elapsed = time.perf_counter() - started
+    delta = lambda name: controller.stats.get(name, 0) - before.get(name, 0)
+    return requests / elapsed, delta("connections"), delta("POST /dna/system/api/v1/auth/token")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DNACConnector with and without connection pooling.")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per workload")
+    parser.add_argument("--threads", type=int, default=8, help="Threads for the concurrent workloads")
+    parser.add_argument("--latency", type=float, default=0.005, help="Seconds the mock delays each API request")
+    parser.add_argument("--token-latency", type=float, default=0.05, help="Seconds the mock delays each token request")
+    args = parser.parse_args()
+
+    warnings.simplefilter("ignore")
+    v6 = load_script("bench_vbr_v6", "VBR-v6.py")
+    with MockController(users=10, latency=args.latency, token_latency=args.token_latency) as controller:
+        credentials = {"base_url": controller.url, "username": "admin", "password": "admin", "verify": False}
+        # Resolve the route and import the SDK family once, outside the measurements
+        with contextlib.redirect_stdout(io.StringIO()):
+            make_request(v6, credentials, v6.ConnectionPool())(0)
+
+        print("{} requests, latency {:.0f} ms, token latency {:.0f} ms".format(
+            args.requests, args.latency * 1000, args.token_latency * 1000))
+        print("{:10} {:>8} {:>12} {:>12} {:>8}".format("workload", "threads", "requests/s", "connections", "tokens"))
+        results = {}
+        for threads in (1, args.threads):
+            for label in ("unpooled", "pooled"):
+                pool = v6.ConnectionPool() if label == "pooled" else None
+                with contextlib.redirect_stdout(io.StringIO()):
+                    rate, connections, tokens = run(
+                        controller, make_request(v6, credentials, pool), args.requests, threads)
+                results[label, threads] = rate
+                print("{:10} {:8} {:12.1f} {:12} {:8}".format(label, threads, rate, connections, tokens))
+            print("  pooled / unpooled at {} thread(s): {:.1f}x".format(
+                threads, results["pooled", threads] / results["unpooled", threads]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Benchmarks FamilyMatcher against difflib.get_close_matches over one API version's families.
+
+The family names are those of dnacentersdk's v2_3_7_6 package. Queries are the repo's own
+examples plus randomly perturbed family names (dropped, inserted and replaced characters,
+'_' written as ' '). Every FamilyMatcher implementation is first checked against difflib
+for n in (1, 3, 5) and cutoff in (0.0, 0.3, 0.6), then timed per query:
+- cold: each query seen for the first time, so nothing is answered from the memo
+- warm: the same queries again, answered from the memo
+find_closest_family only needs the first match, so best_match (n=1) is timed as well,
+cold and fresh: on a new matcher per query, as in a process that resolves a single hint.
+The 10x target applies to cold best_match on the perturbed (inexact) hints.
+
+Usage:
+    python benchmarks/bench_family_matcher.py [--queries 2000] [--seed 0]
+"""
+import argparse
+import contextlib
+import difflib
+import importlib.util
+import io
+import os
+import random
+import string
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+FAMILIES = [
+    "ai_endpoint_analytics", "application_policy", "applications", "authentication_management",
+    "cisco_trusted_certificates", "clients", "command_runner", "compliance", "configuration_archive",
+    "configuration_templates", "device_onboarding_pnp", "device_replacement", "devices", "disaster_recovery",
+    "discovery", "eox", "event_management", "fabric_wireless", "file", "health_and_performance", "issues",
+    "itsm", "itsm_integration", "lan_automation", "licenses", "network_settings", "path_trace", "platform",
+    "reports", "sda", "security_advisories", "sensors", "site_design", "sites", "software_image_management_swim",
+    "system_settings", "tag", "task", "topology", "user_and_roles", "users", "wireless",
+]
+
+# The family hints the routing scripts are called with
+EXAMPLES = ["user role", "user_and role", "user_and_roles", "user_and_role", "users", "devices", "site"]
+
+TARGET_SPEEDUP = 10.0
+
+
+def load_script(name, relative_path):
+    """Loads a repo script as a module with its stdout suppressed."""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(REPO_DIR, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    with contextlib.redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(module)
+    return module
+
+
+def perturbed_queries(count, seed):
+    """Returns count distinct queries, each a family name with up to four random edits."""
+    chooser = random.Random(seed)
+    queries = []
+    seen = set(EXAMPLES)
+    while len(queries) < count:
+        name = chooser.choice(FAMILIES)
+        query = list(name.replace("_", " ") if chooser.random() < 0.3 else name)
+        for _ in range(chooser.randint(0, 4)):
+            position = chooser.randint(0, max(0, len(query) - 1))
+            edit = chooser.randint(0, 2)
+            if edit == 0 and query:
+                del query[position]
+            elif edit == 1:
+                query.insert(position, chooser.choice(string.ascii_lowercase + "_ "))
+            elif query:
+                query[position] = chooser.choice(string.ascii_lowercase + "_ ")
+        query = "".join(query)
+        if query not in seen:
+            seen.add(query)
+            queries.append(query)
+    return queries
+
+
+def per_query_us(function, queries):
+    """Returns the mean microseconds of function over the queries."""
+    started = time.perf_counter()
+    for query in queries:
+        function(query)
+    return (time.perf_counter() - started) / len(queries) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FamilyMatcher against difflib.get_close_matches.")
+    parser.add_argument("--queries", type=int, default=2000, help="Perturbed queries to generate")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the perturbed queries")
+    args = parser.parse_args()
+
+    matchers = {
+        "VBR-v6.py": load_script("bench_vbr_v6", "VBR-v6.py").FamilyMatcher,
+        "version_based_routing.py": load_script("bench_version_based_routing", "version_based_routing.py").FamilyMatcher,
+    }
+    queries = EXAMPLES + perturbed_queries(args.queries, args.seed)
+    exact = [name for name in FAMILIES]
+
+    mismatches = 0
+    for label, matcher_class in matchers.items():
+        matcher = matcher_class(FAMILIES)
+        for query in queries + exact:
+            for n in (1, 3, 5):
+                for cutoff in (0.0, 0.3, 0.6):
+                    if matcher.get_close_matches(query, n, cutoff) != difflib.get_close_matches(query, FAMILIES, n, cutoff):
+                        mismatches += 1
+                        if mismatches <= 5:
+                            print("MISMATCH {}: {!r} n={} cutoff={}".format(label, query, n, cutoff))
+    for query in EXAMPLES[:2]:
+        print("{!r} -> {}".format(query, difflib.get_close_matches(query, FAMILIES)))
+
+    print("{} families, {} perturbed queries + {} exact names, microseconds per query".format(
+        len(FAMILIES), len(queries), len(exact)))
+    print("{:<26} {:<14} {:>10} {:>10} {:>9}".format("implementation", "query set", "call", "us", "speedup"))
+    met = True
+    for query_set, set_queries in (("perturbed", queries), ("exact", exact)):
+        difflib_us = per_query_us(lambda query: difflib.get_close_matches(query, FAMILIES), set_queries)
+        print("{:<26} {:<14} {:>10} {:>10.2f} {:>9}".format("difflib", query_set, "n=3", difflib_us, "1.0x"))
+        for label, matcher_class in matchers.items():
+            matcher = matcher_class(FAMILIES)
+            cold = per_query_us(matcher.get_close_matches, set_queries)
+            warm = per_query_us(matcher.get_close_matches, set_queries)
+            best = per_query_us(matcher_class(FAMILIES).best_match, set_queries)
+            fresh = per_query_us(lambda query: matcher_class(FAMILIES).best_match(query), set_queries)
+            for call, value in (("n=3 cold", cold), ("n=3 warm", warm), ("best cold", best), ("best fresh", fresh)):
+                print("{:<26} {:<14} {:>10} {:>10.2f} {:>8.1f}x".format(label, query_set, call, value, difflib_us / value))
+            if query_set == "perturbed":
+                met = met and difflib_us / best >= TARGET_SPEEDUP
+
+    print("Results identical to difflib" if not mismatches else "{} mismatches".format(mismatches))
+    print("Cold best_match on inexact hints {} the {:.0f}x target".format("meets" if met else "does NOT meet", TARGET_SPEEDUP))
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+"""
+Benchmarks fan_out_user_and_role.fan_out against 50 mock controllers.
+
+Starts --controllers mock controllers on their own ports and reconciles the same user
+config (one update, one create) on all of them with fan_out, once per --workers value,
+each time on fresh controllers. Every run must succeed on every controller and leave
+both users as configured.
+
+The module resolves its routes from a route manifest of the installed dnacentersdk, built
+into a temporary directory with the root version_based_routing.py, since the static tables
+name an older SDK's functions.
+
+Each module run is mostly CPU: starting Python, Ansible and building a DNACenterAPI. Runs only
+overlap usefully with more workers when there are cores to run them on.
+
+Usage:
+    python benchmarks/bench_fan_out.py [--controllers 50] [--workers 1,8] [--latency 0.02]
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from mock_controller import MockController
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+MODULE_DIR = os.path.join(REPO_DIR, "user_version_based_routing")
+VERSION = "2.3.7.6"
+
+SHARED_PARAMS = {
+    "state": "merged",
+    "dnac_log": False,
+    "config": [
+        {"username": "user3", "first_name": "Changed", "role_list": ["OBSERVER-ROLE"]},
+        {"username": "newbie", "first_name": "New", "last_name": "User", "email": "newbie@example.com",
+         "password": "Passw0rd!x", "role_list": ["OBSERVER-ROLE"]},
+    ],
+}
+
+
+def load_script(name, path):
+    """Loads a script as a module with its stdout suppressed."""
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    with contextlib.redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(module)
+    return module
+
+
+def converged(controller):
+    """Returns True if the controller holds both users as SHARED_PARAMS configures them."""
+    users = {user.get("username"): user for user in controller.users()}
+    updated = users.get("user3") or {}
+    created = users.get("newbie") or {}
+    return (updated.get("firstName") == "Changed" and updated.get("roleList") == ["role-observer"]
+            and created.get("email") == "newbie@example.com" and created.get("roleList") == ["role-observer"])
+
+
+def run(fan_out, count, workers, latency):
+    """Runs fan_out on count fresh mock controllers; returns (seconds, module run times, failures)."""
+    with contextlib.ExitStack() as stack:
+        controllers = [stack.enter_context(MockController(users=100, latency=latency)) for _ in range(count)]
+        params = [{"dnac_host": "127.0.0.1", "dnac_port": str(controller.port), "dnac_username": "admin",
+                   "dnac_password": "admin", "dnac_verify": False, "dnac_version": VERSION}
+                  for controller in controllers]
+
+        started = time.perf_counter()
+        report = fan_out(params, SHARED_PARAMS, max_workers=workers)
+        seconds = time.perf_counter() - started
+
+        failures = ["{}: {}".format(result["dnac_host"] + ":" + params[index]["dnac_port"],
+                                    str(result["result"].get("msg"))[-300:])
+                    for index, result in enumerate(report["results"]) if result["failed"]]
+        failures += ["127.0.0.1:{} did not converge".format(controller.port)
+                     for controller, result in zip(controllers, report["results"])
+                     if not result["failed"] and not converged(controller)]
+        return seconds, [result["elapsed"] for result in report["results"]], failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark fan_out against many mock controllers.")
+    parser.add_argument("--controllers", type=int, default=50, help="Mock controllers to reconcile")
+    parser.add_argument("--workers", default="1,8", help="Comma-separated max_workers values to run")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds each mock delays every API request")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_fan_out_") as directory:
+        manifest_path = os.path.join(directory, "route_manifest.json")
+        root_router = load_script("bench_root_router", os.path.join(REPO_DIR, "version_based_routing.py"))
+        root_router.compile_route_manifest(manifest_path, [VERSION])
+        # Read by the user router at import, here and in every module process fan_out starts
+        os.environ["VBR_ROUTE_MANIFEST"] = manifest_path
+        os.environ["VBR_ROUTE_MANIFEST_BIN"] = os.path.join(directory, "missing.bin")
+        sys.path.insert(0, MODULE_DIR)
+        from fan_out_user_and_role import fan_out
+
+        print("{} controllers, {:.0f} ms latency per API request".format(args.controllers, args.latency * 1000))
+        print("{:>8} {:>10} {:>15} {:>22}".format("workers", "wall (s)", "controllers/s", "median module run (s)"))
+        failed = False
+        for workers in (int(value) for value in args.workers.split(",")):
+            seconds, elapsed, failures = run(fan_out, args.controllers, workers, args.latency)
+            print("{:8} {:10.2f} {:15.2f} {:22.2f}".format(
+                workers, seconds, args.controllers / seconds, statistics.median(elapsed)))
+            for failure in failures:
+                print("  FAILED " + failure)
+            failed = failed or bool(failures)
+    if not failed:
+        print("Every controller converged in every run")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
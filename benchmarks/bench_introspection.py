@@ -0,0 +1,156 @@
+"""
+Benchmarks the __dict__ method scanner against inspect.getmembers on a synthetic family class.
+
+Builds a 2,000-method class shaped like the SDK's generated families, checks that every
+list_defined_methods / get_class_names implementation returns exactly what the
+inspect.getmembers filters did, and times a cold scan (new class each round) and a warm one.
+
+Usage:
+    python benchmarks/bench_introspection.py [--methods 2000] [--rounds 20]
+"""
+import argparse
+import contextlib
+import importlib.util
+import inspect
+import io
+import os
+import statistics
+import sys
+import time
+import types
+
+from synthetic_sdk import class_name, family_source, method_keys
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+
+
+def getmembers_methods(cls_obj):
+    """The inspect.getmembers filter the scanners replace."""
+    return [name for name, obj in inspect.getmembers(cls_obj, inspect.isfunction)
+            if obj.__module__ == cls_obj.__module__]
+
+
+def getmembers_classes(module):
+    """The inspect.getmembers filter get_class_names used."""
+    return [name for name, obj in inspect.getmembers(module, inspect.isclass)
+            if obj.__module__ == module.__name__]
+
+
+def load_script(name, relative_path):
+    """Loads a repo script as a module with its stdout suppressed."""
+    spec = importlib.util.spec_from_file_location(name, os.path.join(REPO_DIR, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    with contextlib.redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(module)
+    return module
+
+
+def load_snippet():
+    """Loads the functions of version_based_routing.txt, which are written as methods."""
+    namespace = {"__name__": "bench_version_based_routing_txt"}
+    with open(os.path.join(REPO_DIR, "version_based_routing.txt")) as snippet_file:
+        exec(compile(snippet_file.read(), "version_based_routing.txt", "exec"), namespace)
+    return namespace
+
+
+def build_family_module(methods, name="bench_family"):
+    """Builds a module holding a family class with the given number of methods."""
+    module = types.ModuleType(name)
+    function_names = [key + "_ap_i" for key in method_keys(methods)]
+    exec(family_source(class_name("user_and_roles"), function_names), module.__dict__)
+    return module
+
+
+def build_edge_module():
+    """Builds a module whose classes exercise inheritance, shadowing and descriptor kinds."""
+    module = types.ModuleType("bench_edges")
+    exec(
+        "import json\n"
+        "class Base(object):\n"
+        "    def inherited(self): pass\n"
+        "    def shadowed(self): pass\n"
+        "    @property\n"
+        "    def prop(self): return 1\n"
+        "class Family(Base):\n"
+        "    shadowed = None\n"
+        "    dumps = staticmethod(json.dumps)\n"
+        "    @staticmethod\n"
+        "    def static(): pass\n"
+        "    @classmethod\n"
+        "    def klass(cls): pass\n"
+        "    def _private(self): pass\n"
+        "    def method(self): pass\n"
+        "    lambda_method = lambda self: None\n"
+        "class Zeta(Family): pass\n"
+        "Alias = Family\n",
+        module.__dict__,
+    )
+    return module
+
+
+def time_scan(scan, make_class, rounds):
+    """Returns the median seconds of scan over rounds, with a fresh class from make_class each round."""
+    samples = []
+    for _ in range(rounds):
+        cls_obj = make_class()
+        started = time.perf_counter()
+        scan(cls_obj)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the __dict__ method scanner.")
+    parser.add_argument("--methods", type=int, default=2000, help="Methods on the synthetic family class")
+    parser.add_argument("--rounds", type=int, default=20, help="Timed rounds per measurement")
+    args = parser.parse_args()
+
+    v6 = load_script("bench_vbr_v6", "VBR-v6.py")
+    router = load_script("bench_version_based_routing", "version_based_routing.py")
+    v2 = load_script("bench_vbr_v2", "VBR-v2_static_classes.py")
+    snippet = load_snippet()
+    scanners = {
+        "VBR-v6.py": v6.scan_defined_methods,
+        "version_based_routing.py": router.list_defined_methods,
+        "version_based_routing.txt": lambda cls_obj: snippet["list_defined_methods"](None, cls_obj),
+        "VBR-v2_static_classes.py": v2.list_defined_methods,
+    }
+    class_scanners = {
+        "VBR-v6.py": v6.scan_class_names,
+        "version_based_routing.py": router.get_class_names,
+        "version_based_routing.txt": lambda module: snippet["get_class_names"](None, module),
+    }
+
+    family_module = build_family_module(args.methods)
+    edge_module = build_edge_module()
+    mismatches = 0
+    for module in (family_module, edge_module):
+        for cls_name in getmembers_classes(module):
+            expected = getmembers_methods(getattr(module, cls_name))
+            for label, scan in scanners.items():
+                if scan(getattr(module, cls_name)) != expected:
+                    print("MISMATCH {} on {}.{}".format(label, module.__name__, cls_name))
+                    mismatches += 1
+        for label, scan in class_scanners.items():
+            if scan(module) != getmembers_classes(module):
+                print("MISMATCH {} class names on {}".format(label, module.__name__))
+                mismatches += 1
+
+    family_class = getattr(family_module, class_name("user_and_roles"))
+    make_class = lambda: getattr(build_family_module(args.methods), class_name("user_and_roles"))
+    baseline = time_scan(getmembers_methods, make_class, args.rounds)
+    cold = time_scan(v6.scan_defined_methods, make_class, args.rounds)
+    v6.scan_defined_methods(family_class)
+    warm = time_scan(v6.scan_defined_methods, lambda: family_class, args.rounds)
+
+    print("{}-method class, median of {} rounds".format(args.methods, args.rounds))
+    print("  inspect.getmembers : {:9.3f} ms".format(baseline * 1000))
+    print("  __dict__ scan, cold: {:9.3f} ms  ({:.1f}x)".format(cold * 1000, baseline / cold))
+    print("  __dict__ scan, warm: {:9.3f} ms  ({:.0f}x)".format(warm * 1000, baseline / warm))
+    print("Outputs identical to inspect.getmembers" if not mismatches else "{} mismatches".format(mismatches))
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+"""
+Benchmarks the memory-mapped binary route manifest against the nested modules dict.
+
+For each size, the same synthetic route tables are written as a JSON manifest (loaded
+into the nested {version: {family: {key: name}}} dict the router used to keep) and as a
+binary manifest (mapped with BinaryRouteManifest). Each is opened in a fresh worker:
+- load_ms: json.load of the manifest, or mapping the binary file and checking its header
+- heap_kib: Python heap still allocated after loading, i.e. what every forked worker owns
+  privately; the mapped pages are shared through the page cache and not counted
+- lookup_us: median of warm lookups over a fixed query sample
+
+Usage:
+    python benchmarks/bench_manifest.py [--versions 10 --versions 100] [--families 60] [--methods 20]
+"""
+import argparse
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from synthetic_sdk import build_tables
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROUTER_PATH = os.path.join(os.path.dirname(BENCH_DIR), "user_version_based_routing", "version_based_routing.py")
+
+QUERY_COUNT = 1000
+
+
+def load_router():
+    """Loads the user_and_role router as a fresh module with its stdout suppressed."""
+    spec = importlib.util.spec_from_file_location("bench_user_router", ROUTER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    with contextlib.redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(module)
+    return module
+
+
+def build_queries(tables, count=QUERY_COUNT, seed=0):
+    """Samples (version, family, function key) queries across the tables."""
+    chooser = random.Random(seed)
+    versions = sorted(tables)
+    families = sorted(tables[versions[0]])
+    keys = sorted(tables[versions[0]][families[0]])
+    return [(chooser.choice(versions), chooser.choice(families), chooser.choice(keys)) for _ in range(count)]
+
+
+def run_worker(kind, path, queries, iterations):
+    """Opens one manifest in this process and returns its metrics."""
+    router = load_router() if kind == "binary" else None
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    if kind == "json":
+        with open(path) as manifest_file:
+            modules = json.load(manifest_file)["versions"]
+        lookup = lambda version, family, key: modules.get(version, {}).get(family, {}).get(key)
+    else:
+        manifest = router.BinaryRouteManifest(path)
+        lookup = manifest.lookup
+    load_ms = (time.perf_counter() - started) * 1000
+    heap, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Resolve every query once, so the timed loop only measures warm lookups
+    results = [lookup(*query) for query in queries]
+    samples = []
+    for index in range(iterations):
+        query = queries[index % len(queries)]
+        call_started = time.perf_counter_ns()
+        lookup(*query)
+        samples.append(time.perf_counter_ns() - call_started)
+
+    return {
+        "load_ms": round(load_ms, 3),
+        "heap_kib": round(heap / 1024.0, 1),
+        "lookup_us": round(statistics.median(samples) / 1000.0, 3),
+        "resolved": sum(result is not None for result in results),
+    }
+
+
+def spawn_worker(kind, path, queries_path, iterations):
+    """Runs a worker in a fresh interpreter and returns its metrics."""
+    env = dict(os.environ)
+    env.pop("VBR_PRERESOLVED_ROUTES", None)
+    command = [sys.executable, os.path.abspath(__file__), "--worker", kind, "--path", path,
+               "--queries", queries_path, "--iterations", str(iterations)]
+    completed = subprocess.run(command, env=env, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the binary route manifest against the modules dict.")
+    parser.add_argument("--versions", type=int, action="append", help="SDK versions in the manifest, repeatable "
+                                                                       "(default: 10 and 100)")
+    parser.add_argument("--families", type=int, default=60, help="Families per version")
+    parser.add_argument("--methods", type=int, default=20, help="Function keys per family")
+    parser.add_argument("--iterations", type=int, default=20000, help="Warm lookups timed per worker")
+    parser.add_argument("--repeat", type=int, default=3, help="Workers per measurement, the median is kept")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    parser.add_argument("--queries", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        with open(args.queries) as queries_file:
+            queries = [tuple(query) for query in json.load(queries_file)]
+        print(json.dumps(run_worker(args.worker, args.path, queries, args.iterations)))
+        return 0
+
+    columns = ["load_ms", "heap_kib", "lookup_us", "file_kib"]
+    print("{:<9} {:<8}".format("versions", "format") + "".join("{:>11}".format(name) for name in columns))
+    with tempfile.TemporaryDirectory() as workdir:
+        os.environ["VBR_ROUTE_MANIFEST"] = os.path.join(workdir, "no_route_manifest.json")
+        os.environ["VBR_ROUTE_MANIFEST_BIN"] = os.path.join(workdir, "no_route_manifest.bin")
+        router = load_router()
+        for versions in args.versions or [10, 100]:
+            tables = build_tables(versions, args.families, args.methods)
+            queries_path = os.path.join(workdir, "queries_{}.json".format(versions))
+            with open(queries_path, "w") as queries_file:
+                json.dump(build_queries(tables), queries_file)
+
+            paths = {"json": os.path.join(workdir, "routes_{}.json".format(versions)),
+                     "binary": os.path.join(workdir, "routes_{}.bin".format(versions))}
+            with open(paths["json"], "w") as manifest_file:
+                json.dump({"format": 1, "versions": tables}, manifest_file, separators=(",", ":"))
+            router.write_binary_manifest(tables, paths["binary"])
+
+            for kind, path in paths.items():
+                runs = [spawn_worker(kind, path, queries_path, args.iterations) for _ in range(args.repeat)]
+                if any(run["resolved"] != QUERY_COUNT for run in runs):
+                    print("{} manifest resolved {} of {} queries".format(kind, runs[0]["resolved"], QUERY_COUNT))
+                    return 1
+                metrics = {name: statistics.median(run[name] for run in runs) for name in columns[:3]}
+                metrics["file_kib"] = round(os.path.getsize(path) / 1024.0, 1)
+                print("{:<9} {:<8}".format(versions, kind) + "".join("{:>11}".format(metrics[name]) for name in columns))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+"""
+Benchmarks route resolution across every version-based-routing implementation in the repo.
+
+Each variant is loaded from its file with importlib (stdout suppressed, since the scripts print
+as they route) against a synthetic SDK tree generated on disk by synthetic_sdk.py. The static-table
+variants get the same routes installed into their tables, so every variant resolves the same
+(version, family, function key) queries.
+
+Each variant/scenario pair runs in fresh worker processes, so module caches start cold:
+- cold_ms: running the compiled variant (plus installing its own copy of the static tables) and its
+  first lookup; the script is compiled, and the SDK tree byte-compiled, before anything is measured
+- p50_us / p99_us: per-lookup latency once every query has been resolved once
+- peak_kib / retained_kib: tracemalloc peak while loading and resolving every query once, and what is
+  still allocated at the end of that pass (separate worker)
+- imports / sdk_imports: modules, and dnacentersdk modules, imported up to the end of the first pass
+- hit_rate: share of queries resolved to the expected SDK function name
+
+Results are compared against baseline.json; a metric above its baseline by more than the tolerance
+fails the run. Baselines are machine specific, refresh them with --update-baseline.
+
+Usage:
+    python benchmarks/bench_routing.py [--scenario base] [--update-baseline]
+"""
+import argparse
+import compileall
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import OrderedDict
+
+from synthetic_sdk import build_tables, class_name, family_source, write_sdk_tree
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+# Scenario -> (versions, families, methods per family); each scales one axis from the base size
+SCENARIOS = OrderedDict([
+    ("base", (5, 10, 10)),
+    ("versions", (200, 10, 10)),
+    ("families", (5, 100, 10)),
+    ("methods", (5, 10, 2000)),
+])
+
+VARIANTS = OrderedDict([
+    ("v2_static_classes", "VBR-v2_static_classes.py"),
+    ("v3_static_str", "VBR-v3_static_str.py"),
+    ("v4", "VBR-v4.py"),
+    ("v5_key_value", "VBR-V5-key-value.py"),
+    ("v6", "VBR-v6.py"),
+    ("version_based_routing", "version_based_routing.py"),
+    ("user_version_based_routing", os.path.join("user_version_based_routing", "version_based_routing.py")),
+])
+
+# Metric -> absolute slack added to the relative tolerance, so tiny timings don't fail on noise
+METRIC_SLACK = {"cold_ms": 5.0, "p50_us": 2.0, "p99_us": 10.0, "peak_kib": 64.0, "retained_kib": 64.0,
+                "imports": 0, "sdk_imports": 0}
+
+QUERY_COUNT = 100
+
+
+def install_v2(module, tables):
+    """Defines one class per version and family in the module, as the v2 script does by hand."""
+    module.valid_versions = set(tables)
+    module.modules = {}
+    for version, family_tables in tables.items():
+        formatted_version = module.format_version(version)
+        module.modules[formatted_version] = {}
+        for family, function_table in family_tables.items():
+            family_class_name = "{}_{}".format(class_name(family), formatted_version)
+            exec(family_source(family_class_name, function_table.values()), module.__dict__)
+            module.modules[formatted_version][family] = family_class_name
+    return module.call_function
+
+
+def own_tables(tables):
+    """Copies the tables with their own string objects, as a module's literals or a loaded manifest would have."""
+    return json.loads(json.dumps(tables))
+
+
+def install_v3(module, tables):
+    """Installs per-family lists of function names."""
+    tables = own_tables(tables)
+    module.valid_versions = set(tables)
+    module.modules = {version: {family: list(function_table.values())
+                                for family, function_table in family_tables.items()}
+                      for version, family_tables in tables.items()}
+    return module.call_function
+
+
+def install_key_value(module, tables):
+    """Installs per-family {function key: function name} tables (v4, v5 and the user module)."""
+    tables = own_tables(tables)
+    module.valid_versions = set(module.valid_versions) | set(tables)
+    if hasattr(module, "route_store"):
+        # Modules with a route store serve lookups from it; they drop their own tables at import
+        module.route_store = module.RouteStore.from_tables(tables)
+    else:
+        module.modules = tables
+    return getattr(module, "get_function", None) or module.call_function
+
+
+def install_v6(module, tables):
+    """Routes through a VersionBasedRouting instance over the on-disk SDK tree."""
+    return module.VersionBasedRouting().resolve_route
+
+
+def install_sdk(module, tables):
+    """Routes through the module's call_function over the on-disk SDK tree."""
+    return module.call_function
+
+
+INSTALLERS = {
+    "v2_static_classes": install_v2,
+    "v3_static_str": install_v3,
+    "v4": install_key_value,
+    "v5_key_value": install_key_value,
+    "v6": install_v6,
+    "version_based_routing": install_sdk,
+    "user_version_based_routing": install_key_value,
+}
+
+
+def compile_variant(variant):
+    """Compiles a variant script, so loading it later only runs its code."""
+    path = os.path.join(REPO_DIR, VARIANTS[variant])
+    with open(path) as variant_file:
+        return path, compile(variant_file.read(), path, "exec")
+
+
+def load_variant(variant, compiled):
+    """Runs a compiled variant script as a fresh module with its stdout suppressed."""
+    path, code = compiled
+    spec = importlib.util.spec_from_file_location("bench_" + variant, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    with contextlib.redirect_stdout(io.StringIO()):
+        exec(code, module.__dict__)
+    return module
+
+
+def build_queries(tables, count=QUERY_COUNT, seed=0):
+    """Samples (version, family, function key, expected function name) queries across the tables."""
+    chooser = random.Random(seed)
+    versions = sorted(tables)
+    queries = []
+    for _ in range(count):
+        version = chooser.choice(versions)
+        family = chooser.choice(sorted(tables[version]))
+        key = chooser.choice(sorted(tables[version][family]))
+        queries.append((version, family, key, tables[version][family][key]))
+    return queries
+
+
+def percentile(samples, fraction):
+    """Returns the nearest-rank percentile of the samples."""
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_worker(variant, tree, sizes, iterations, memory):
+    """Measures one variant in this process and returns its metrics."""
+    sys.path.insert(0, tree)
+    tables = build_tables(*sizes)
+    queries = build_queries(tables)
+    # Compiled up front, so neither the timings nor the memory peak depend on a cached .pyc
+    compiled = compile_variant(variant)
+    modules_before = set(sys.modules)
+    sink = io.StringIO()
+
+    if memory:
+        tracemalloc.start()
+
+    started = time.perf_counter()
+    lookup = INSTALLERS[variant](load_variant(variant, compiled), tables)
+    with contextlib.redirect_stdout(sink):
+        first = lookup(*queries[0][:3])
+    cold_ms = (time.perf_counter() - started) * 1000
+
+    # Resolve every query once, so the timed loop only measures warm lookups
+    with contextlib.redirect_stdout(sink):
+        results = [first] + [lookup(*query[:3]) for query in queries[1:]]
+
+    if memory:
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {"peak_kib": round(peak / 1024.0, 1), "retained_kib": round(retained / 1024.0, 1)}
+
+    imported = set(sys.modules) - modules_before
+    samples = []
+    with contextlib.redirect_stdout(sink):
+        for index in range(iterations):
+            version, family, key, _ = queries[index % len(queries)]
+            call_started = time.perf_counter_ns()
+            lookup(version, family, key)
+            samples.append(time.perf_counter_ns() - call_started)
+            if index % 4096 == 4095:
+                sink.seek(0)
+                sink.truncate()
+
+    return {
+        "cold_ms": round(cold_ms, 3),
+        "p50_us": round(percentile(samples, 0.50) / 1000.0, 3),
+        "p99_us": round(percentile(samples, 0.99) / 1000.0, 3),
+        "imports": len(imported),
+        "sdk_imports": sum(1 for name in imported if name.split(".")[0] == "dnacentersdk"),
+        "hit_rate": round(sum(result == query[3] for result, query in zip(results, queries)) / len(queries), 3),
+    }
+
+
+def spawn_worker(variant, tree, sizes, iterations, memory=False):
+    """Runs a worker for one variant in a fresh interpreter and returns its metrics."""
+    env = dict(os.environ)
+    # Keep the variants on their plain code paths: no on-disk route caches or manifests
+    for name in ("VBR_ROUTE_CACHE", "VBR_PRERESOLVED_ROUTES"):
+        env.pop(name, None)
+    env["VBR_ROUTE_MANIFEST"] = os.path.join(tree, "no_route_manifest.json")
+    env["VBR_ROUTE_MANIFEST_BIN"] = os.path.join(tree, "no_route_manifest.bin")
+    command = [sys.executable, os.path.abspath(__file__), "--worker", variant, "--tree", tree,
+               "--sizes", ",".join(str(size) for size in sizes), "--iterations", str(iterations)]
+    if memory:
+        command.append("--memory")
+    completed = subprocess.run(command, env=env, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.splitlines()[-1])
+
+
+def measure(variant, tree, sizes, iterations, repeat):
+    """Returns the median timing metrics over repeat workers, plus the memory peak."""
+    runs = [spawn_worker(variant, tree, sizes, iterations) for _ in range(repeat)]
+    metrics = {name: statistics.median(run[name] for run in runs) for name in runs[0]}
+    metrics.update(spawn_worker(variant, tree, sizes, iterations, memory=True))
+    return metrics
+
+
+def compare(results, baseline, tolerance):
+    """Returns a description of every metric that regressed against the baseline."""
+    regressions = []
+    for scenario, variants in results.items():
+        for variant, metrics in variants.items():
+            expected = baseline.get(scenario, {}).get(variant)
+            if expected is None:
+                continue
+            for name, slack in METRIC_SLACK.items():
+                if name not in expected:
+                    continue
+                limit = expected[name] * (1 + tolerance) + slack if slack else expected[name]
+                if metrics[name] > limit:
+                    regressions.append("{}/{}: {} {} > baseline {}".format(
+                        scenario, variant, name, metrics[name], expected[name]))
+            if metrics["hit_rate"] < expected.get("hit_rate", 0):
+                regressions.append("{}/{}: hit_rate {} < baseline {}".format(
+                    scenario, variant, metrics["hit_rate"], expected["hit_rate"]))
+    return regressions
+
+
+def print_table(results):
+    """Prints the results as one row per scenario and variant."""
+    columns = ["cold_ms", "p50_us", "p99_us", "peak_kib", "retained_kib", "imports", "sdk_imports", "hit_rate"]
+    print("{:<10} {:<28}".format("scenario", "variant") + "".join("{:>13}".format(name) for name in columns))
+    for scenario, variants in results.items():
+        for variant, metrics in variants.items():
+            print("{:<10} {:<28}".format(scenario, variant)
+                  + "".join("{:>13}".format(metrics[name]) for name in columns))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark route resolution across the routing variants.")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS),
+                        help="Scenario to run, repeatable (default: all)")
+    parser.add_argument("--variant", action="append", choices=list(VARIANTS),
+                        help="Variant to run, repeatable (default: all)")
+    parser.add_argument("--iterations", type=int, default=5000, help="Warm lookups timed per worker")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing workers per variant, the median is kept")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed relative slowdown over the baseline")
+    parser.add_argument("--workdir", help="Directory for the synthetic SDK trees (default: a temp directory)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline file to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--tree", help=argparse.SUPPRESS)
+    parser.add_argument("--sizes", help=argparse.SUPPRESS)
+    parser.add_argument("--memory", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        sizes = tuple(int(size) for size in args.sizes.split(","))
+        print(json.dumps(run_worker(args.worker, args.tree, sizes, args.iterations, args.memory)))
+        return 0
+
+    workdir = args.workdir or os.path.join(tempfile.gettempdir(), "vbr_bench_sdk")
+    results = OrderedDict()
+    for scenario in args.scenario or SCENARIOS:
+        sizes = SCENARIOS[scenario]
+        tree = os.path.join(workdir, "{}_{}_{}".format(*sizes))
+        write_sdk_tree(tree, *sizes)
+        # Every worker then imports the tree from bytecode, whether or not an earlier run left it
+        compileall.compile_dir(os.path.join(tree, "dnacentersdk"), quiet=1)
+        results[scenario] = OrderedDict(
+            (variant, measure(variant, tree, sizes, args.iterations, args.repeat))
+            for variant in args.variant or VARIANTS
+        )
+    print_table(results)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    if args.update_baseline:
+        for scenario, variants in results.items():
+            baseline.setdefault(scenario, {}).update(variants)
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(baseline, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write("\n")
+        print("Baseline written to {}".format(args.baseline))
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print("REGRESSION " + regression)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""
+Benchmarks diff_user_batch against the per-user user_requires_update diff it replaced.
+
+Builds 100,000 current users as UserRecords with two roles each, and desired configs
+where about a third change a name, email or role. Reports diffs per second for:
+- legacy: the old user_requires_update if/elif body, one user at a time
+- per user: diff_user_batch called with one user, as user_requires_update now calls it
+- batch: one diff_user_batch call over all users, as unconverged_configs calls it
+
+The legacy diff only compared the first role, so the outputs are checked against each
+other on single-role configs that set every field, where both diffs must agree.
+
+Usage:
+    python benchmarks/bench_user_diff.py [--users 100000] [--rounds 5] [--seed 0]
+"""
+import argparse
+import importlib.util
+import os
+import random
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+MODULE_DIR = os.path.join(REPO_DIR, "user_version_based_routing")
+
+ROLE_IDS_BY_NAME = {"SUPER-ADMIN-ROLE": "role-super-admin", "NETWORK-ADMIN-ROLE": "role-network-admin",
+                    "OBSERVER-ROLE": "role-observer"}
+ROLE_NAMES = sorted(ROLE_IDS_BY_NAME)
+
+
+def load_user_module():
+    """Loads the user_and_role module, which imports the user router from its own directory."""
+    sys.path.insert(0, MODULE_DIR)
+    spec = importlib.util.spec_from_file_location(
+        "bench_user_and_role", os.path.join(MODULE_DIR, "version_based_routing_user_and_role.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_users(module, count, seed, roles_per_user):
+    """Returns (desired configs, current UserRecords), about a third of the configs differing."""
+    chooser = random.Random(seed)
+    desired_users = []
+    current_users = []
+    for index in range(count):
+        role_names = chooser.sample(ROLE_NAMES, roles_per_user)
+        current = dict(user_id="user-{}".format(index), username="user{}".format(index),
+                       first_name="First{}".format(index), last_name="Last{}".format(index),
+                       email="user{}@example.com".format(index),
+                       role_list=[ROLE_IDS_BY_NAME[name] for name in role_names])
+        desired = {field: current[field] for field in module.USER_DIFF_FIELDS}
+        desired["role_list"] = list(role_names)
+        change = chooser.randrange(9)
+        if change == 0:
+            desired["first_name"] = "Renamed{}".format(index)
+        elif change == 1:
+            desired["email"] = "moved{}@example.com".format(index)
+        elif change == 2:
+            desired["role_list"] = [name for name in ROLE_NAMES if name not in role_names][:roles_per_user]
+        desired_users.append(desired)
+        current_users.append(module.UserRecord(**current))
+    return desired_users, current_users
+
+
+def legacy_requires_update(want, current_user, current_role):
+    """user_requires_update as it was before diff_user_batch, with self.want passed in."""
+    update_required = False
+    update_user_param = {}
+
+    if current_user.get('first_name') != want.get('first_name'):
+        update_user_param['first_name'] = want['first_name']
+        update_required = True
+    elif 'first_name' not in update_user_param:
+        update_user_param['first_name'] = current_user['first_name']
+
+    if current_user.get('last_name') != want.get('last_name'):
+        update_user_param['last_name'] = want['last_name']
+        update_required = True
+    elif 'last_name' not in update_user_param:
+        update_user_param['last_name'] = current_user['last_name']
+
+    if current_user.get('email') != want.get('email'):
+        update_user_param['email'] = want['email']
+        update_required = True
+    elif 'email' not in update_user_param:
+        update_user_param['email'] = current_user['email']
+
+    if current_user.get('username') != want.get('username'):
+        update_user_param['username'] = want['username']
+        update_required = True
+    elif 'username' not in update_user_param:
+        update_user_param['username'] = current_user['username']
+
+    if current_user.get('role_list')[0] != current_role[want.get("role_list")[0]]:
+        role_id = current_role[want.get("role_list")[0]]
+        update_user_param['role_list'] = [role_id]
+        update_required = True
+    elif 'role_list' not in update_user_param:
+        update_user_param['role_list'] = [current_role[want.get("role_list")[0]]]
+
+    return (update_required, update_user_param)
+
+
+def legacy_diff(module, desired_users, current_users):
+    return [legacy_requires_update(want, current, ROLE_IDS_BY_NAME)
+            for want, current in zip(desired_users, current_users)]
+
+
+def per_user_diff(module, desired_users, current_users):
+    return [module.diff_user_batch([want], [current], ROLE_IDS_BY_NAME)[0]
+            for want, current in zip(desired_users, current_users)]
+
+
+def batch_diff(module, desired_users, current_users):
+    return module.diff_user_batch(desired_users, current_users, ROLE_IDS_BY_NAME)
+
+
+def time_diff(diff, module, desired_users, current_users, rounds):
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        diff(module, desired_users, current_users)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the table-driven user diff.")
+    parser.add_argument("--users", type=int, default=100000, help="Users to diff")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed rounds per measurement")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the changed configs")
+    args = parser.parse_args()
+
+    module = load_user_module()
+    desired_users, current_users = make_users(module, min(args.users, 10000), args.seed, 1)
+    expected = legacy_diff(module, desired_users, current_users)
+    if batch_diff(module, desired_users, current_users) != expected:
+        print("MISMATCH between the legacy and batch diffs on single-role users")
+        return 1
+
+    desired_users, current_users = make_users(module, args.users, args.seed, 2)
+    changed = sum(update_required for update_required, _ in batch_diff(module, desired_users, current_users))
+    print("{:,} users with two roles, {:,} needing an update, median of {} rounds".format(
+        args.users, changed, args.rounds))
+    legacy = None
+    for label, diff in (("legacy user_requires_update", legacy_diff),
+                        ("diff_user_batch per user", per_user_diff),
+                        ("diff_user_batch, one batch", batch_diff)):
+        seconds = time_diff(diff, module, desired_users, current_users, args.rounds)
+        legacy = legacy or seconds
+        print("  {:28}: {:9,.0f} diffs/s  ({:.2f}x)".format(label, args.users / seconds, legacy / seconds))
+    print("Batch diff identical to the legacy diff on single-role users")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
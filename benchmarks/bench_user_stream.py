@@ -0,0 +1,136 @@
+"""
+Benchmarks streaming get_users against parsing the whole response, on a mock controller.
+
+Serves a mock controller with 100,000 users and looks up the first, middle and last user
+two ways, each in a fresh worker process:
+- full: the SDK's get_users_api, camel_to_snake_case over the whole response and a linear
+  scan, as the module did before the response was streamed
+- stream: User.stream_users with the SDK session's URL and token, iter_records and a UserDirectory lookup,
+  which stops reading the body at the first match
+
+Each lookup runs twice, once timed and once under tracemalloc for the peak heap.
+
+Usage:
+    python benchmarks/bench_user_stream.py [--users 100000]
+"""
+import argparse
+import importlib.util
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import tracemalloc
+import types
+import warnings
+
+from mock_controller import MockController
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+MODULE_DIR = os.path.join(REPO_DIR, "user_version_based_routing")
+PIPELINES = ("full", "stream")
+
+
+def load_user_module():
+    """Loads the user_and_role module, which imports the user router from its own directory."""
+    sys.path.insert(0, MODULE_DIR)
+    spec = importlib.util.spec_from_file_location(
+        "bench_user_and_role", os.path.join(MODULE_DIR, "version_based_routing_user_and_role.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def camel_to_snake_case(config):
+    """DnacBase.camel_to_snake_case without its per-key logging."""
+    if isinstance(config, dict):
+        return {re.sub(r'([a-z0-9])([A-Z])', r'\1_\2', key).lower(): camel_to_snake_case(value)
+                for key, value in config.items()}
+    if isinstance(config, list):
+        return [camel_to_snake_case(item) for item in config]
+    return config
+
+
+def find_full(api, user_module, username):
+    response = api.user_and_roles.get_users_api(invoke_source="external", auth_source="internal")
+    users = camel_to_snake_case(response).get("response").get("users")
+    for user in users:
+        if user.get("username") == username:
+            return user
+    return None
+
+
+def find_stream(api, user_module, username):
+    caller = types.SimpleNamespace(dnac=types.SimpleNamespace(api=api), routes={"get_users": "get_users_api"},
+                                   stream_session=None, log=lambda msg, level="INFO": None)
+    stream = user_module.User.stream_users(caller, {"invokeSource": "external", "authSource": "internal"})
+    if stream is None:
+        raise RuntimeError("get_users could not be streamed")
+    directory = user_module.UserDirectory(
+        user_module.iter_records(stream, "users", user_module.USER_FIELDS), [], source=stream)
+    try:
+        return directory.get_user(username)
+    finally:
+        directory.close()
+
+
+def worker(url, pipeline, username, measure_memory):
+    """Runs one lookup and prints its seconds and peak heap bytes as JSON."""
+    warnings.simplefilter("ignore")
+    from dnacentersdk import DNACenterAPI
+
+    user_module = load_user_module()
+    api = DNACenterAPI(base_url=url, username="admin", password="admin", verify=False, version="2.3.7.6")
+    api.user_and_roles.get_roles_api()  # authenticates outside the measurement
+    find = find_full if pipeline == "full" else find_stream
+
+    if measure_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    user = find(api, user_module, username)
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1] if measure_memory else None
+    if user is None or user.get("username") != username:
+        raise RuntimeError("{} did not find {}".format(pipeline, username))
+    print(json.dumps({"seconds": elapsed, "peak": peak}))
+
+
+def run_worker(url, pipeline, username, measure_memory):
+    env = dict(os.environ, VBR_ROUTE_MANIFEST=os.devnull + ".missing", VBR_ROUTE_MANIFEST_BIN=os.devnull + ".missing")
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--worker", url, pipeline, username]
+        + (["--memory"] if measure_memory else []),
+        check=True, capture_output=True, text=True, env=env,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streaming get_users on a mock controller.")
+    parser.add_argument("--users", type=int, default=100000, help="Users the mock controller serves")
+    parser.add_argument("--worker", nargs=3, metavar=("URL", "PIPELINE", "USERNAME"), help=argparse.SUPPRESS)
+    parser.add_argument("--memory", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(*args.worker, measure_memory=args.memory)
+        return 0
+
+    targets = (("first", 0), ("middle", args.users // 2), ("last", args.users - 1))
+    with MockController(users=args.users) as controller:
+        print("{:,} users, {:.1f} MB body".format(args.users, len(controller.users_body()) / 1e6))
+        print("{:8} {:8} {:>10} {:>12}".format("user", "pipeline", "time (ms)", "peak (MiB)"))
+        for label, index in targets:
+            for pipeline in PIPELINES:
+                username = "user{}".format(index)
+                timed = run_worker(controller.url, pipeline, username, False)
+                traced = run_worker(controller.url, pipeline, username, True)
+                print("{:8} {:8} {:10.1f} {:12.2f}".format(
+                    label, pipeline, timed["seconds"] * 1000, traced["peak"] / 1048576))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+Benchmarks USER_CONFIG_VALIDATOR against the per-entry validation the user module used to run.
+
+Builds 10,000 user config entries, about one in ten with a bad email, password, name
+length or role list, and validates them two ways:
+- legacy: validate_list_of_dicts with a spec dict built per call, then the old
+  valid_user_config_parameters body per entry, which rebuilt its param_specs and regexes
+- compiled: validate_list_of_dicts with USER_CONFIG_SPEC, then USER_CONFIG_VALIDATOR.validate_many
+Both must report the same messages for the same entries. validate_list_of_dicts is timed
+on its own too, since both ways share it and it is the collection's.
+
+Usage:
+    python benchmarks/bench_user_validation.py [--entries 10000] [--rounds 10] [--seed 0]
+"""
+import argparse
+import importlib.util
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+MODULE_DIR = os.path.join(REPO_DIR, "user_version_based_routing")
+
+
+def load_user_module():
+    """Loads the user_and_role module, which imports the user router from its own directory."""
+    sys.path.insert(0, MODULE_DIR)
+    spec = importlib.util.spec_from_file_location(
+        "bench_user_and_role", os.path.join(MODULE_DIR, "version_based_routing_user_and_role.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_entries(count, seed):
+    """Returns count user config entries, roughly a tenth of them invalid in one field."""
+    chooser = random.Random(seed)
+    entries = []
+    for index in range(count):
+        entry = {
+            "username": "user{}".format(index),
+            "first_name": "First{}".format(index),
+            "last_name": "Last{}".format(index),
+            "email": "user{}@example.com".format(index),
+            "password": "Passw0rd!{}".format(index),
+            "role_list": ["OBSERVER-ROLE"],
+        }
+        fault = chooser.randrange(40)
+        if fault == 0:
+            entry["email"] = "user{}.example.com".format(index)
+        elif fault == 1:
+            entry["password"] = "password{}".format(index)
+        elif fault == 2:
+            entry["first_name"] = "F" * 300
+        elif fault == 3:
+            entry["role_list"] = "OBSERVER-ROLE"
+        entries.append(entry)
+    return entries
+
+
+def legacy_validate(module, userlist):
+    """validate_input_yml and valid_user_config_parameters as they were before USER_CONFIG_VALIDATOR."""
+    user_details = dict(first_name = dict(required = False, type = 'str'),
+                        last_name = dict(required = False, type = 'str'),
+                        email = dict(required = False, type = 'str'),
+                        password = dict(required = False, type = 'str'),
+                        username = dict(required = True, type = 'str'),
+                        role_list = dict(required = False, type = 'list', elements='str'),
+                        )
+    valid_param, invalid_param = module.validate_list_of_dicts(userlist, user_details)
+    errors = {}
+    for index, user_config in enumerate(valid_param):
+        errormsg = []
+        if user_config.get("first_name"):
+            param_spec = dict(type = "str", length_max = 255)
+            module.validate_str(user_config["first_name"], param_spec, "first_name", errormsg)
+        if user_config.get("last_name"):
+            param_spec = dict(type = "str", length_max = 255)
+            module.validate_str(user_config["last_name"], param_spec, "last_name", errormsg)
+        if user_config.get("email"):
+            email_regex = re.compile(r"[^@]+@[^@]+\.[^@]+")
+            if not email_regex.match(user_config["email"]):
+                errormsg.append("email: Invalid email format for email: '{0}'".format(user_config["email"]))
+        if user_config.get("password"):
+            password_regex = re.compile(r'^(?=.*[A-Z])(?=.*[a-z])(?=.*\d)(?=.*[@$!%*?&])[A-Za-z\d@$!%*?&]{8,}$')
+            if not password_regex.match(user_config["password"]):
+                errormsg.append("password: Password does not meet complexity requirements for password: '{0}'".format(user_config["password"]))
+        if user_config.get("username"):
+            param_spec = dict(type = "str", length_max = 255)
+            module.validate_str(user_config["username"], param_spec, "username", errormsg)
+        if user_config.get("role_list"):
+            param_spec = dict(type = "list", elements="str")
+            module.validate_list(user_config["role_list"], param_spec, "role_list", errormsg)
+        if errormsg:
+            errors[index] = errormsg
+    return invalid_param, errors
+
+
+def compiled_validate(module, userlist):
+    """validate_input_yml's checks as they are now."""
+    valid_param, invalid_param = module.validate_list_of_dicts(userlist, module.USER_CONFIG_SPEC)
+    return invalid_param, module.USER_CONFIG_VALIDATOR.validate_many(valid_param)
+
+
+def spec_only_validate(module, userlist):
+    """The validate_list_of_dicts pass both ways share."""
+    return module.validate_list_of_dicts(userlist, module.USER_CONFIG_SPEC)
+
+
+def time_validate(validate, module, entries, rounds):
+    """Returns the median seconds of validate over rounds, each on a fresh copy of the entries."""
+    samples = []
+    for _ in range(rounds):
+        userlist = [dict(entry) for entry in entries]
+        started = time.perf_counter()
+        validate(module, userlist)
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the compiled user config validator.")
+    parser.add_argument("--entries", type=int, default=10000, help="User config entries to validate")
+    parser.add_argument("--rounds", type=int, default=10, help="Timed rounds per measurement")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the invalid entries")
+    args = parser.parse_args()
+
+    module = load_user_module()
+    entries = make_entries(args.entries, args.seed)
+    expected = legacy_validate(module, [dict(entry) for entry in entries])
+    actual = compiled_validate(module, [dict(entry) for entry in entries])
+    if actual != expected:
+        print("MISMATCH: legacy flagged {} entries, compiled flagged {}".format(len(expected[1]), len(actual[1])))
+        return 1
+
+    legacy = time_validate(legacy_validate, module, entries, args.rounds)
+    compiled = time_validate(compiled_validate, module, entries, args.rounds)
+    shared = time_validate(spec_only_validate, module, entries, args.rounds)
+    print("{:,} entries, {} invalid, median of {} rounds".format(args.entries, len(expected[1]), args.rounds))
+    print("  legacy per-entry specs : {:8.1f} ms".format(legacy * 1000))
+    print("  USER_CONFIG_VALIDATOR  : {:8.1f} ms  ({:.2f}x)".format(compiled * 1000, legacy / compiled))
+    print("  of which validate_list_of_dicts: {:.1f} ms; per-entry checks {:.1f} ms -> {:.1f} ms ({:.1f}x)".format(
+        shared * 1000, (legacy - shared) * 1000, (compiled - shared) * 1000, (legacy - shared) / (compiled - shared)))
+    print("Messages identical to the legacy validation")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,278 @@
+"""
+A local mock Catalyst Center controller for the module and connector benchmarks.
+
+Serves the endpoints the user module and the connectors call, with the response shapes
+dnacentersdk expects:
+- POST /dna/system/api/v1/auth/token                 {"Token": ...}
+- GET  /dna/system/api/v1/user                       {"response": {"users": [...]}}, streamed in chunks
+- POST /dna/system/api/v1/user, PUT ..., DELETE .../{userId}
+- GET  /dna/system/api/v1/roles                      {"response": {"roles": [...]}}
+- any other GET                                      {"response": []}
+
+Requests without a token the controller issued get a 401. Every request can be delayed by a
+fixed latency, and token requests by their own, to stand in for a remote controller. stats
+counts connections, requests per method and path, and the peak number of API requests served
+at once. By default it serves HTTPS with a throwaway self-signed certificate made with openssl,
+since the Ansible module always builds an https:// base URL.
+
+Usage:
+    python benchmarks/mock_controller.py [--port 8443] [--users 100000] [--latency 0.02] [--http]
+"""
+import argparse
+import json
+import os
+import shutil
+import ssl
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+USER_PATH = "/dna/system/api/v1/user"
+ROLE_PATH = "/dna/system/api/v1/roles"
+TOKEN_PATH = "/dna/system/api/v1/auth/token"
+
+ROLES = [
+    {"roleId": "role-super-admin", "name": "SUPER-ADMIN-ROLE", "description": "", "type": "DEFAULT"},
+    {"roleId": "role-network-admin", "name": "NETWORK-ADMIN-ROLE", "description": "", "type": "DEFAULT"},
+    {"roleId": "role-observer", "name": "OBSERVER-ROLE", "description": "", "type": "DEFAULT"},
+]
+
+BODY_CHUNK = 65536
+
+
+def make_users(count):
+    """Returns count user records shaped like the get_users response."""
+    return [{
+        "userId": "user-{}".format(index),
+        "username": "user{}".format(index),
+        "firstName": "First{}".format(index),
+        "lastName": "Last{}".format(index),
+        "email": "user{}@example.com".format(index),
+        "authSource": "internal",
+        "passphraseUpdateTime": "1700000000000",
+        "roleList": [ROLES[index % len(ROLES)]["roleId"]],
+    } for index in range(count)]
+
+
+def make_certificate(directory):
+    """Writes a self-signed certificate and key for 127.0.0.1 and returns their paths."""
+    if shutil.which("openssl") is None:
+        raise RuntimeError("openssl is needed to serve HTTPS; run the mock controller with tls=False")
+    cert_path = os.path.join(directory, "cert.pem")
+    key_path = os.path.join(directory, "key.pem")
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "ec", "-pkeyopt", "ec_paramgen_curve:prime256v1", "-nodes",
+         "-days", "1", "-subj", "/CN=127.0.0.1", "-keyout", key_path, "-out", cert_path],
+        check=True, capture_output=True,
+    )
+    return cert_path, key_path
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    """Request handler; the controller state lives on the server."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; with Nagle on, the body waits for a delayed ACK
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        if isinstance(self.request, ssl.SSLSocket):
+            self.request.do_handshake()
+        super().setup()
+        self.server.controller.count("connections")
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, payload=None, body=None):
+        body = body if body is not None else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        # Written in chunks, so a streaming client can start parsing before the body is complete
+        try:
+            for start in range(0, len(body), BODY_CHUNK):
+                self.wfile.write(body[start:start + BODY_CHUNK])
+        except (ConnectionError, ssl.SSLError):
+            # A streaming client that found what it needed closes the connection mid-body
+            self.close_connection = True
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def handle_request(self, method):
+        controller = self.server.controller
+        path = urlsplit(self.path).path
+        controller.count(method + " " + path)
+        if method == "POST" and path == TOKEN_PATH:
+            time.sleep(controller.token_latency)
+            self.send_json(200, {"Token": controller.issue_token()})
+            return
+
+        controller.enter()
+        try:
+            time.sleep(controller.latency)
+            self.handle_api_request(method, path)
+        finally:
+            controller.leave()
+
+    def handle_api_request(self, method, path):
+        controller = self.server.controller
+        if self.headers.get("X-Auth-Token") not in controller.tokens:
+            self.send_json(401, {"response": {"errorCode": "Unauthorized", "message": "Invalid token"}})
+            return
+
+        if path == USER_PATH and method == "GET":
+            self.send_json(200, body=controller.users_body())
+        elif path == USER_PATH and method in ("POST", "PUT"):
+            self.send_json(200, {"response": {"userId": controller.save_user(self.read_json()),
+                                              "message": "User saved"}})
+        elif path.startswith(USER_PATH + "/") and method == "DELETE":
+            controller.delete_user(path.rsplit("/", 1)[1])
+            self.send_json(200, {"response": {"message": "User deleted"}})
+        elif path == ROLE_PATH and method == "GET":
+            self.send_json(200, {"response": {"roles": ROLES}})
+        elif method == "GET":
+            self.send_json(200, {"response": []})
+        else:
+            self.send_json(404, {"response": {"errorCode": "NotFound", "message": path}})
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+    def do_PUT(self):
+        self.handle_request("PUT")
+
+    def do_DELETE(self):
+        self.handle_request("DELETE")
+
+
+class MockController:
+    """A mock controller served from a background thread; use as a context manager."""
+
+    def __init__(self, users=10, latency=0.0, token_latency=0.0, tls=True, port=0):
+        """
+        Parameters:
+        users (int): Number of users the controller starts with.
+        latency (float): Seconds every API request is delayed.
+        token_latency (float): Seconds every token request is delayed.
+        tls (bool): Serve HTTPS with a self-signed certificate instead of HTTP.
+        port (int): Port to listen on, 0 for any free port.
+        """
+        self.latency = latency
+        self.token_latency = token_latency
+        self.tls = tls
+        self.tokens = set()
+        self.stats = {}
+        self.in_flight = 0
+        self._users = {user["userId"]: user for user in make_users(users)}
+        self._users_body = None
+        self._lock = threading.Lock()
+        self._cert_dir = None
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), MockHandler)
+        self.server.daemon_threads = True
+        self.server.controller = self
+        self.port = self.server.server_address[1]
+        self._thread = None
+
+    @property
+    def url(self):
+        return "{}://127.0.0.1:{}".format("https" if self.tls else "http", self.port)
+
+    def count(self, name):
+        with self._lock:
+            self.stats[name] = self.stats.get(name, 0) + 1
+
+    def enter(self):
+        # Tracks API requests being served at once; stats["peak_in_flight"] keeps the maximum
+        with self._lock:
+            self.in_flight += 1
+            self.stats["peak_in_flight"] = max(self.stats.get("peak_in_flight", 0), self.in_flight)
+
+    def leave(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def issue_token(self):
+        token = uuid.uuid4().hex
+        with self._lock:
+            self.tokens.add(token)
+        return token
+
+    def users_body(self):
+        # Serialized once and reused until a user changes, so large payloads cost nothing per request
+        with self._lock:
+            if self._users_body is None:
+                self._users_body = json.dumps({"response": {"users": list(self._users.values())}}).encode("utf-8")
+            return self._users_body
+
+    def save_user(self, fields):
+        with self._lock:
+            user_id = fields.get("userId") or "user-{}".format(uuid.uuid4().hex[:12])
+            user = self._users.setdefault(user_id, {"userId": user_id, "authSource": "internal"})
+            user.update((key, value) for key, value in fields.items() if key != "password")
+            self._users_body = None
+        return user_id
+
+    def delete_user(self, user_id):
+        with self._lock:
+            self._users.pop(user_id, None)
+            self._users_body = None
+
+    def users(self):
+        with self._lock:
+            return list(self._users.values())
+
+    def start(self):
+        if self.tls:
+            self._cert_dir = tempfile.mkdtemp(prefix="mock_controller_")
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(*make_certificate(self._cert_dir))
+            # The handshake runs in the handler thread, not in the accept loop
+            self.server.socket = context.wrap_socket(self.server.socket, server_side=True,
+                                                     do_handshake_on_connect=False)
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self._cert_dir:
+            shutil.rmtree(self._cert_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a mock Catalyst Center controller.")
+    parser.add_argument("--port", type=int, default=8443, help="Port to listen on")
+    parser.add_argument("--users", type=int, default=10, help="Number of users to serve")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds each API request is delayed")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="Seconds each token request is delayed")
+    parser.add_argument("--http", action="store_true", help="Serve plain HTTP instead of HTTPS")
+    args = parser.parse_args()
+
+    with MockController(args.users, args.latency, args.token_latency, not args.http, args.port) as controller:
+        print("Mock controller listening on {}".format(controller.url))
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
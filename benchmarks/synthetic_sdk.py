@@ -0,0 +1,92 @@
+"""Generates a synthetic dnacentersdk tree on disk for the routing benchmarks."""
+import json
+import os
+
+FAMILY_WORDS = ["user", "role", "site", "device", "policy", "network", "wireless", "fabric",
+                "event", "task", "license", "image"]
+VERBS = ["get", "add", "update", "delete", "create", "list", "sync", "reset"]
+NOUNS = ["users", "roles", "sites", "devices", "settings", "servers", "attributes", "profiles",
+         "pools", "zones", "tags", "images", "events", "templates", "reports", "credentials"]
+
+
+def version_names(count):
+    """Returns count distinct 'X.Y.Z.W' version strings."""
+    return ["2.{}.{}.{}".format(3 + index // 100, (index // 10) % 10, index % 10) for index in range(count)]
+
+
+def family_names(count):
+    """Returns count distinct snake_case family module names."""
+    names = [first for first in FAMILY_WORDS]
+    names += ["{}_and_{}".format(first, second) for first in FAMILY_WORDS for second in FAMILY_WORDS
+              if first != second]
+    return names[:count]
+
+
+def method_keys(count):
+    """Returns count distinct function keys such as 'get_users' or 'add_roles_2'."""
+    keys = []
+    index = 0
+    while len(keys) < count:
+        verb = VERBS[index % len(VERBS)]
+        noun = NOUNS[(index // len(VERBS)) % len(NOUNS)]
+        series = index // (len(VERBS) * len(NOUNS))
+        keys.append("{}_{}".format(verb, noun) if series == 0 else "{}_{}_{}".format(verb, noun, series))
+        index += 1
+    return keys
+
+
+def class_name(family):
+    """Converts a family module name to the SDK's CamelCase class name."""
+    return "".join(part.capitalize() for part in family.split("_"))
+
+
+def build_tables(versions, families, methods):
+    """Returns {version: {family: {function key: SDK function name}}} for the given sizes."""
+    tables = {}
+    keys = method_keys(methods)
+    for position, version in enumerate(version_names(versions)):
+        # Alternate the SDK's two method-name styles, as 2.3.5.3 (_api) and 2.3.7.6 (_ap_i) do
+        suffix = "_api" if position % 2 == 0 else "_ap_i"
+        family_table = {key: key + suffix for key in keys}
+        tables[version] = {family: family_table for family in family_names(families)}
+    return tables
+
+
+def family_source(family_class_name, function_names):
+    """Returns the source of one family class, shaped like the SDK's generated classes."""
+    lines = ["class {}(object):".format(family_class_name),
+             "    def __init__(self, session, object_factory=None, request_validator=None):",
+             "        self._session = session",
+             ""]
+    for function_name in function_names:
+        lines.append("    def {}(self, **request_parameters):".format(function_name))
+        lines.append("        return {{'function': '{}'}}".format(function_name))
+        lines.append("")
+    return "\n".join(lines)
+
+
+def write_sdk_tree(root, versions, families, methods):
+    """Writes the tree under root/dnacentersdk once per size and returns the route tables it encodes."""
+    tables = build_tables(versions, families, methods)
+    marker = os.path.join(root, "sizes.json")
+    if os.path.exists(marker):
+        return tables
+
+    api_dir = os.path.join(root, "dnacentersdk", "api")
+    os.makedirs(api_dir, exist_ok=True)
+    with open(os.path.join(root, "dnacentersdk", "__init__.py"), "w") as init_file:
+        init_file.write("__version__ = '0.0.0+synthetic'\n")
+    open(os.path.join(api_dir, "__init__.py"), "w").close()
+
+    for version, family_tables in tables.items():
+        version_dir = os.path.join(api_dir, "v" + version.replace(".", "_"))
+        os.makedirs(version_dir, exist_ok=True)
+        open(os.path.join(version_dir, "__init__.py"), "w").close()
+        for family, function_table in family_tables.items():
+            with open(os.path.join(version_dir, family + ".py"), "w") as family_file:
+                family_file.write(family_source(class_name(family), function_table.values()))
+
+    # Written last, so an interrupted run is regenerated rather than reused
+    with open(marker, "w") as marker_file:
+        json.dump({"versions": versions, "families": families, "methods": methods}, marker_file)
+    return tables
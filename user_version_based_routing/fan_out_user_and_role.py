@@ -0,0 +1,149 @@
+"""
+Runs version_based_routing_user_and_role.py against many Catalyst Center controllers.
+
+Controllers are grouped by dnac_version and the module's routes are resolved once per
+group, then handed to every module run of that group. Each controller is reconciled in
+its own module process, at most --max-workers at a time, and the module results are
+merged into one report.
+
+Usage:
+    python fan_out_user_and_role.py --controllers controllers.json --params params.json
+
+controllers.json is a list of module params per controller (dnac_host, dnac_version,
+credentials, ...); params.json holds the params shared by every controller (config,
+state, ...). Per-controller params win over the shared ones.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from version_based_routing import PRERESOLVED_ROUTES_ENV, resolve_functions
+
+MODULE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'version_based_routing_user_and_role.py')
+
+# Function keys the module resolves at startup, matches ROUTE_KEYS in version_based_routing_user_and_role.py
+USER_ROUTE_KEYS = ("get_users", "get_roles", "add_user", "update_user", "delete_user")
+
+# The module's own default when a controller does not set dnac_version
+DEFAULT_VERSION = '2.2.3.3'
+
+
+# Function to group controllers by version, keeping their input position for the report
+def group_by_version(controllers, shared_params):
+    groups = OrderedDict()
+    for position, controller in enumerate(controllers):
+        params = dict(shared_params, **controller)
+        version = params.get('dnac_version') or DEFAULT_VERSION
+        groups.setdefault(version, []).append((position, params))
+    return groups
+
+
+# Function to run the module for one controller in its own process and parse its JSON result
+def run_controller(params, env, timeout=None):
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as args_file:
+        json.dump({'ANSIBLE_MODULE_ARGS': params}, args_file)
+
+    started = time.monotonic()
+    try:
+        completed = subprocess.run(
+            [sys.executable, MODULE_PATH, args_file.name],
+            env=env, capture_output=True, text=True, timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        return {'failed': True, 'msg': 'Module timed out after {0}s'.format(timeout)}, time.monotonic() - started
+    finally:
+        os.unlink(args_file.name)
+    elapsed = time.monotonic() - started
+
+    # The module result is the last JSON object the module printed
+    for line in reversed(completed.stdout.splitlines()):
+        line = line.strip()
+        if line.startswith('{'):
+            try:
+                return json.loads(line), elapsed
+            except ValueError:
+                continue
+
+    return {'failed': True, 'rc': completed.returncode,
+            'msg': (completed.stderr or completed.stdout).strip()[-2000:]}, elapsed
+
+
+# Function to reconcile every controller and merge the module results into one report
+def fan_out(controllers, shared_params, max_workers=8, timeout=None):
+    groups = group_by_version(controllers, shared_params)
+    results = [None] * len(controllers)
+    futures = []
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for version, members in groups.items():
+            routes = resolve_functions(version, 'user_and_roles', USER_ROUTE_KEYS)
+            if routes is None:
+                # No module run can succeed for this version, so none is started
+                for position, params in members:
+                    results[position] = (params, {'failed': True, 'msg': "Catalyst Center version '{0}' is not "
+                                                  "supported by the user module".format(version)}, 0.0)
+                continue
+
+            env = dict(os.environ)
+            env[PRERESOLVED_ROUTES_ENV] = json.dumps({version: {'user_and_roles': routes}})
+            for position, params in members:
+                futures.append((position, params, executor.submit(run_controller, params, env, timeout)))
+
+        for position, params, future in futures:
+            result, elapsed = future.result()
+            results[position] = (params, result, elapsed)
+
+    return build_report(groups, results)
+
+
+# Function to summarise the per-controller results, overall and per version
+def build_report(groups, results):
+    report = {
+        'summary': {'controllers': len(results), 'succeeded': 0, 'failed': 0, 'changed': 0},
+        'versions': {version: len(members) for version, members in groups.items()},
+        'results': [],
+    }
+    for params, result, elapsed in results:
+        failed = bool(result.get('failed'))
+        report['summary']['failed' if failed else 'succeeded'] += 1
+        report['summary']['changed'] += int(bool(result.get('changed')))
+        report['results'].append({
+            'dnac_host': params.get('dnac_host'),
+            'dnac_version': params.get('dnac_version') or DEFAULT_VERSION,
+            'failed': failed,
+            'changed': bool(result.get('changed')),
+            'elapsed': round(elapsed, 3),
+            'result': result,
+        })
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the user_and_role module against many controllers.')
+    parser.add_argument('--controllers', required=True, help='JSON list of per-controller module params')
+    parser.add_argument('--params', help='JSON object of module params shared by every controller')
+    parser.add_argument('--max-workers', type=int, default=8, help='Maximum number of module processes at once')
+    parser.add_argument('--timeout', type=float, help='Seconds before a module run is abandoned')
+    parser.add_argument('--report', help='Write the merged report to this file instead of stdout')
+    args = parser.parse_args()
+
+    with open(args.controllers) as controllers_file:
+        controllers = json.load(controllers_file)
+    shared_params = {}
+    if args.params:
+        with open(args.params) as params_file:
+            shared_params = json.load(params_file)
+
+    report = fan_out(controllers, shared_params, max_workers=args.max_workers, timeout=args.timeout)
+    if args.report:
+        with open(args.report, 'w') as report_file:
+            json.dump(report, report_file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    sys.exit(1 if report['summary']['failed'] else 0)
@@ -1,3 +1,13 @@
+import bisect
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from functools import lru_cache
+
 # Define valid versions and modules
 valid_versions = {'2.2.2.3', '2.2.3.3', '2.3.3.0', '2.3.5.3', '2.3.7.6'}
 
@@ -38,27 +48,403 @@ modules = {
     }
 }
 
+# Route manifest written by `python version_based_routing.py --build-manifest <path>`
+ROUTE_MANIFEST_PATH = os.environ.get(
+    'VBR_ROUTE_MANIFEST',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'route_manifest.json')
+)
+
+
+# Function to load the compiled route manifest, returns None when none has been built
+def load_route_manifest(path=ROUTE_MANIFEST_PATH):
+    try:
+        with open(path) as manifest_file:
+            manifest = json.load(manifest_file)
+    except FileNotFoundError:
+        return None
+    except ValueError as e:
+        print(f"Ignoring invalid route manifest '{path}': {e}")
+        return None
+    return manifest.get('versions')
+
+
+# Function to overlay the compiled manifest on the static tables, family by family, so versions and
+# families the manifest was not built with keep their hand-maintained routes
+def merge_route_manifest(static_modules, manifest_modules):
+    merged = {version: dict(families) for version, families in static_modules.items()}
+    for version, families in (manifest_modules or {}).items():
+        merged.setdefault(version, {}).update(families)
+    return merged
+
+
+# The compiled manifest overrides the hand-maintained tables above wherever it has routes
+manifest_modules = load_route_manifest()
+if manifest_modules:
+    valid_versions = valid_versions | set(manifest_modules)
+
+
+# Marks a key a version drops from its base table; never a valid method name
+ROUTE_REMOVED = ''
+# Shared empty family table for versions the store does not hold
+NO_FAMILIES = {}
+
+
+class RouteRecord:
+    """Routes of one version and family: a base table shared across versions plus this version's changes to it."""
+
+    __slots__ = ('base', 'delta')
+
+    def __init__(self, base, delta=None):
+        self.base = base
+        self.delta = delta or None
+
+    def get(self, function_key, default=None):
+        if self.delta is not None:
+            function_name = self.delta.get(function_key)
+            if function_name is not None:
+                return function_name or default
+        return self.base.get(function_key, default)
+
+    def __contains__(self, function_key):
+        return self.get(function_key) is not None
+
+    def __getitem__(self, function_key):
+        function_name = self.get(function_key)
+        if function_name is None:
+            raise KeyError(function_key)
+        return function_name
+
+    def items(self):
+        delta = self.delta or {}
+        for function_key, function_name in self.base.items():
+            if function_key not in delta:
+                yield function_key, function_name
+        for function_key, function_name in delta.items():
+            if function_name != ROUTE_REMOVED:
+                yield function_key, function_name
+
+
+class RouteStore:
+    """Compact route tables: keys and method names are interned, and each version is stored as a delta against
+    the closest base table of its family, so versions that share routes share one dict. A version that matches
+    a base exactly, or becomes a base itself, is stored as that plain dict, so its lookups stay dict lookups."""
+
+    def __init__(self, max_delta=0.5):
+        # A table that differs from every base in more than max_delta of its routes becomes a new base
+        self.max_delta = max_delta
+        self._records = {}
+        self._bases = {}
+        # Bound straight to the dict, version checks run on every call
+        self.has_version = self._records.__contains__
+
+    @classmethod
+    def from_tables(cls, tables, **options):
+        store = cls(**options)
+        for version, families in tables.items():
+            for family, functions in families.items():
+                store.add(version, family, functions)
+        return store
+
+    def add(self, version, family, functions):
+        intern = sys.intern
+        routes = {intern(function_key): intern(function_name) for function_key, function_name in functions.items()}
+        family = intern(family)
+
+        base, delta = None, None
+        for candidate in self._bases.get(family, ()):
+            changes = {key: name for key, name in routes.items() if candidate.get(key) != name}
+            changes.update((key, ROUTE_REMOVED) for key in candidate if key not in routes)
+            if delta is None or len(changes) < len(delta):
+                base, delta = candidate, changes
+
+        if base is None or len(delta) > self.max_delta * max(len(routes), 1):
+            base, delta = routes, None
+            self._bases.setdefault(family, []).append(base)
+        record = base if not delta else RouteRecord(base, delta)
+        self._records.setdefault(intern(version), {})[family] = record
+
+    def versions(self):
+        return list(self._records)
+
+    def get_record(self, version, family):
+        return self._records.get(version, NO_FAMILIES).get(family)
+
+    def lookup(self, version, family, function_key):
+        record = self._records.get(version, NO_FAMILIES).get(family)
+        if record is None:
+            return None
+        return record.get(function_key)
+
+    def tables(self):
+        return {version: {family: dict(record.items()) for family, record in families.items()}
+                for version, families in self._records.items()}
+
+
+# Routes are served from the store built from the tables above and the manifest. The tables are
+# dropped once it is built, so the store holds the only copy; edit the tables to change routing.
+route_store = RouteStore.from_tables(merge_route_manifest(modules, manifest_modules))
+del functions_v2_3_5_3, functions_v2_3_7_6, modules, manifest_modules
+
+# Binary manifest layout (little endian):
+#   header   magic, format, string count, record count, SHA-256 of the tables it was built from
+#   offsets  string count + 1 offsets into the string blob
+#   records  (version, family, key, method) string ids, sorted
+#   strings  UTF-8 string blob, sorted so ids can be binary searched
+BINARY_MANIFEST_MAGIC = b'VBRM'
+BINARY_MANIFEST_FORMAT = 2
+BINARY_MANIFEST_HEADER = struct.Struct('<4sIII32s')
+BINARY_MANIFEST_OFFSET = struct.Struct('<I')
+BINARY_MANIFEST_RECORD = struct.Struct('<IIII')
+
+BINARY_MANIFEST_PATH = os.environ.get(
+    'VBR_ROUTE_MANIFEST_BIN',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'route_manifest.bin')
+)
+
+
+# Function to fingerprint a modules table, so a binary manifest built from other tables is detected
+def route_tables_digest(modules_dict):
+    canonical = json.dumps(modules_dict, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).digest()
+
+
+# Function to write a modules table as a binary manifest that can be memory-mapped
+def write_binary_manifest(modules_dict, path):
+    records = []
+    strings = set()
+    for version, families in modules_dict.items():
+        for family, functions in families.items():
+            for function_key, function_name in functions.items():
+                records.append((version, family, function_key, function_name))
+                strings.update((version, family, function_key, function_name))
+
+    # Intern every string once; sorting them keeps the ids in byte order
+    string_table = sorted(string.encode('utf-8') for string in strings)
+    string_ids = {string.decode('utf-8'): index for index, string in enumerate(string_table)}
+    record_ids = sorted(tuple(string_ids[field] for field in record) for record in records)
+
+    # Written next to the live manifest and renamed over it, so readers never map a half-written file
+    temp_fd, temp_path = tempfile.mkstemp(prefix='.route_manifest.', dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(temp_fd, 'wb') as manifest_file:
+            manifest_file.write(BINARY_MANIFEST_HEADER.pack(
+                BINARY_MANIFEST_MAGIC, BINARY_MANIFEST_FORMAT, len(string_table), len(record_ids),
+                route_tables_digest(modules_dict)))
+            offset = 0
+            for string in string_table:
+                manifest_file.write(BINARY_MANIFEST_OFFSET.pack(offset))
+                offset += len(string)
+            manifest_file.write(BINARY_MANIFEST_OFFSET.pack(offset))
+            for record in record_ids:
+                manifest_file.write(BINARY_MANIFEST_RECORD.pack(*record))
+            manifest_file.write(b''.join(string_table))
+        # mkstemp creates the file owner-only; the manifest is shared by every user's module runs
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class BinaryRouteManifest:
+    """Read-only, memory-mapped route manifest; lookups binary search the mapped pages in place."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as manifest_file:
+            self._map = mmap.mmap(manifest_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, manifest_format, self._string_count, self._record_count, self.digest = \
+                BINARY_MANIFEST_HEADER.unpack_from(self._map, 0)
+            if magic != BINARY_MANIFEST_MAGIC:
+                raise ValueError(f"'{path}' is not a binary route manifest.")
+            if manifest_format != BINARY_MANIFEST_FORMAT:
+                raise ValueError(f"'{path}' has unsupported format {manifest_format}.")
+
+            self._offsets_start = BINARY_MANIFEST_HEADER.size
+            self._records_start = self._offsets_start + (self._string_count + 1) * BINARY_MANIFEST_OFFSET.size
+            self._strings_start = self._records_start + self._record_count * BINARY_MANIFEST_RECORD.size
+            # The last offset is the size of the string blob, so a truncated file is caught here, not on lookup
+            if len(self._map) < self._strings_start:
+                raise ValueError(f"'{path}' is truncated.")
+            strings_size, = BINARY_MANIFEST_OFFSET.unpack_from(
+                self._map, self._offsets_start + self._string_count * BINARY_MANIFEST_OFFSET.size)
+            if len(self._map) != self._strings_start + strings_size:
+                raise ValueError(f"'{path}' is truncated.")
+        except (ValueError, struct.error):
+            self._map.close()
+            raise
+        self._string_ids = {}
+
+    def close(self):
+        self._map.close()
+
+    def _string(self, string_id):
+        start, end = struct.unpack_from('<II', self._map, self._offsets_start + string_id * BINARY_MANIFEST_OFFSET.size)
+        return self._map[self._strings_start + start:self._strings_start + end]
+
+    def _string_id(self, string):
+        if string in self._string_ids:
+            return self._string_ids[string]
+        string_id = self._search_string(string.encode('utf-8'))
+        self._string_ids[string] = string_id
+        return string_id
+
+    def _search_string(self, target):
+        low, high = 0, self._string_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._string(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._string_count and self._string(low) == target:
+            return low
+        return None
+
+    def _record(self, index):
+        return BINARY_MANIFEST_RECORD.unpack_from(self._map, self._records_start + index * BINARY_MANIFEST_RECORD.size)
+
+    def _find_record(self, prefix):
+        # Returns the first record whose leading ids are >= prefix
+        low, high = 0, self._record_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._record(middle)[:len(prefix)] < prefix:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._record_count:
+            return self._record(low)
+        return None
+
+    def has_version(self, version):
+        version_id = self._string_id(version)
+        if version_id is None:
+            return False
+        record = self._find_record((version_id,))
+        return record is not None and record[0] == version_id
+
+    def lookup(self, version, family, function_key):
+        ids = (self._string_id(version), self._string_id(family), self._string_id(function_key))
+        if None in ids:
+            return None
+        record = self._find_record(ids)
+        if record is None or record[:3] != ids:
+            return None
+        return self._string(record[3]).decode('utf-8')
+
+
+# Function to open the binary manifest, returns None when none has been built or when it was
+# built from other tables than expected_digest, e.g. before the static tables or JSON manifest changed
+def load_binary_manifest(path=BINARY_MANIFEST_PATH, expected_digest=None):
+    try:
+        manifest = BinaryRouteManifest(path)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, struct.error) as e:
+        print(f"Ignoring invalid binary route manifest '{path}': {e}")
+        return None
+    if expected_digest is not None and manifest.digest != expected_digest:
+        manifest.close()
+        print(f"Ignoring stale binary route manifest '{path}'; rebuild it with `python version_based_routing.py`")
+        return None
+    return manifest
+
+
+binary_manifest = load_binary_manifest(expected_digest=route_tables_digest(route_store.tables()))
+
+# Routes a parent process already resolved, passed as JSON {version: {family: {function key: name}}}
+PRERESOLVED_ROUTES_ENV = 'VBR_PRERESOLVED_ROUTES'
+
+
+# Function to load the routes passed down by a parent process, empty when none were passed
+def load_preresolved_routes():
+    try:
+        return json.loads(os.environ.get(PRERESOLVED_ROUTES_ENV) or '{}')
+    except ValueError:
+        return {}
+
+
+preresolved_routes = load_preresolved_routes()
+
+# Define which routing table serves each range of controller releases: [start, end) version
+# prefixes, with an end of None for an open-ended range. Exact table entries take precedence.
+version_ranges = [
+    ((2, 3, 5), (2, 3, 6), '2.3.5.3'),
+    ((2, 3, 7), None, '2.3.7.6'),
+]
+
+
+# Function to parse a version string such as '2.3.7.6' into (2, 3, 7, 6), None if it is malformed
+@lru_cache(maxsize=None)
+def parse_version(version):
+    try:
+        return tuple(int(part) for part in version.split('.'))
+    except (AttributeError, ValueError):
+        return None
+
+
+# Function to sort the version ranges into parallel start / interval lists for binary search
+def build_version_index(ranges):
+    intervals = sorted(ranges, key=lambda interval: interval[0])
+    return [interval[0] for interval in intervals], intervals
+
+
+version_starts, version_intervals = build_version_index(version_ranges)
+
+
+# Function to check if a routing table exists for exactly this version, in the source lookups read
+def has_table(version):
+    if binary_manifest is not None:
+        return binary_manifest.has_version(version)
+    return route_store.has_version(version)
+
+
+# Function to map a controller version onto the version key of the routing table that serves it
+def resolve_version(version):
+    if has_table(version):
+        return version
+
+    version_tuple = parse_version(version)
+    if version_tuple is None:
+        return None
+
+    # The last range starting at or before the version is the only one that can contain it
+    position = bisect.bisect_right(version_starts, version_tuple) - 1
+    if position < 0:
+        return None
+    _, end, table_version = version_intervals[position]
+    if (end is None or version_tuple < end) and has_table(table_version):
+        return table_version
+    return None
+
 # Function to validate if the provided version is among the known versions
 def validate_version(version):
-    if version not in valid_versions:
+    if version not in valid_versions and resolve_version(version) is None:
         print(f"Unknown API version, known versions are: {', '.join(valid_versions)}")
         return False
     return True
 
 
 def try_import_module(version, family):
-    if version in modules:
-        module_dict = modules[version]
-        if family in module_dict:
-            return module_dict[family]
-        else:
-            raise ImportError(f"Family '{family}' not found in version '{version}'.")
+    record = route_store.get_record(version, family)
+    if record is not None:
+        return record
+    elif route_store.has_version(version):
+        raise ImportError(f"Family '{family}' not found in version '{version}'.")
     else:
         raise ImportError(f"Version '{version}' not found.")
 
 
 def call_function(version, family, function_key):
     if validate_version(version):
+        version = resolve_version(version) or version
+        if binary_manifest is not None:
+            function_name = binary_manifest.lookup(version, family, function_key)
+            if function_name is None:
+                print(f"No function found '{function_key}' in version '{version}'.")
+            return function_name
         try:
             methods_dict = try_import_module(version, family)
             if function_key in methods_dict:
@@ -68,4 +454,25 @@ def call_function(version, family, function_key):
                 return None
         except ImportError as e:
             print(f"ImportError: {e}")
-            return None
\ No newline at end of file
+            return None
+
+
+# Function to resolve a batch of function keys for one version and family in a single pass,
+# returns None if no routing table serves the version and maps undefined keys to None
+def resolve_functions(version, family, function_keys):
+    preset = preresolved_routes.get(version, {}).get(family)
+    if preset is not None and all(key in preset for key in function_keys):
+        return {key: preset[key] for key in function_keys}
+
+    table_version = resolve_version(version)
+    if table_version is None:
+        return None
+    if binary_manifest is not None:
+        return {key: binary_manifest.lookup(table_version, family, key) for key in function_keys}
+    return {key: route_store.lookup(table_version, family, key) for key in function_keys}
+
+
+if __name__ == '__main__':
+    # Snapshot the active route tables (compiled manifest or the static tables) into a binary manifest
+    write_binary_manifest(route_store.tables(), BINARY_MANIFEST_PATH)
+    print(f"Wrote {len(route_store.versions())} versions to {BINARY_MANIFEST_PATH}")
@@ -8,16 +8,479 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 __author__ = ("Ajith Andrew J, Syed khadeer Ahmed")
 
-from version_based_routing import call_function 
+from version_based_routing import resolve_functions
 
-import re, time
+import codecs, json, random, re, threading, time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from ansible_collections.cisco.dnac.plugins.module_utils.dnac import (
     DnacBase,
+    RATE_LIMIT_MESSAGE,
+    RATE_LIMIT_RETRY_AFTER,
     validate_list_of_dicts,
     validate_str,
     validate_list
 )
 from ansible.module_utils.basic import AnsibleModule
+try:
+    import requests
+except ImportError:
+    requests = None
+
+# Fields of the get_users / get_roles records this module actually reads
+USER_FIELDS = ("user_id", "username", "first_name", "last_name", "email", "role_list")
+ROLE_FIELDS = ("role_id", "name")
+
+
+# Playbook spec for a single user entry, checked by validate_list_of_dicts
+USER_CONFIG_SPEC = dict(first_name = dict(required = False, type = 'str'),
+                        last_name = dict(required = False, type = 'str'),
+                        email = dict(required = False, type = 'str'),
+                        password = dict(required = False, type = 'str'),
+                        username = dict(required = True, type = 'str'),
+                        role_list = dict(required = False, type = 'list', elements='str'),
+                        )
+
+EMAIL_REGEX = re.compile(r"[^@]+@[^@]+\.[^@]+")
+PASSWORD_REGEX = re.compile(r'^(?=.*[A-Z])(?=.*[a-z])(?=.*\d)(?=.*[@$!%*?&])[A-Za-z\d@$!%*?&]{8,}$')
+
+
+class UserConfigValidator:
+    """
+    Field checks for user config entries, built once per process.
+
+    Each check is a (field, kind, argument) tuple run in order against every entry
+    that sets the field: "str" and "list" checks apply validate_str and validate_list's
+    rules with a shared param_spec, "regex" checks match a precompiled pattern and
+    format the given error message. Plain str and list values are checked inline with
+    the same messages; anything else still goes through validate_str / validate_list.
+    """
+
+    def __init__(self):
+        name_spec = dict(type = "str", length_max = 255)
+        self.checks = (
+            ("first_name", "str", name_spec),
+            ("last_name", "str", name_spec),
+            ("email", "regex", (EMAIL_REGEX, "email: Invalid email format for email: '{0}'")),
+            ("password", "regex", (PASSWORD_REGEX, "password: Password does not meet complexity requirements for password: '{0}'")),
+            ("username", "str", name_spec),
+            ("role_list", "list", dict(type = "list", elements="str")),
+        )
+
+    def validate(self, user_config):
+        """
+        Parameters:
+        - user_config: type Dict: One user config entry.
+
+        Returns:
+        A list of error messages, empty if the entry is valid.
+        """
+        errormsg = []
+        for (field, kind, argument) in self.checks:
+            value = user_config.get(field)
+            if not value:
+                continue
+            if kind == "str":
+                if type(value) is not str:
+                    validate_str(value, argument, field, errormsg)
+                elif len(value) > argument["length_max"]:
+                    errormsg.append("{0}:{1} : The string exceeds the allowed "
+                                    "range of max {2} char".format(field, value, argument["length_max"]))
+            elif kind == "list":
+                if type(value) is not list:
+                    validate_list(value, argument, field, errormsg)
+                else:
+                    errormsg.extend(
+                        "{0} is not of the same datatype as expected which is {1}".format(element, argument["elements"])
+                        for element in value if type(element).__name__ != argument["elements"]
+                    )
+            elif not argument[0].match(value):
+                errormsg.append(argument[1].format(value))
+        return errormsg
+
+    def validate_many(self, user_configs):
+        """
+        Validates a whole list of entries in one pass.
+
+        Parameters:
+        - user_configs: type List[Dict]: The user config entries.
+
+        Returns:
+        A dict mapping the index of every invalid entry to its error messages.
+        """
+        errors = {}
+        for index, user_config in enumerate(user_configs):
+            entry_errors = self.validate(user_config)
+            if entry_errors:
+                errors[index] = entry_errors
+        return errors
+
+
+USER_CONFIG_VALIDATOR = UserConfigValidator()
+
+# Fields compared one to one between desired and current users; role_list is compared as a set of role IDs
+USER_DIFF_FIELDS = ("first_name", "last_name", "email", "username")
+
+
+def diff_user_batch(desired_users, current_users, role_ids_by_name):
+    """
+    Computes the update payloads for a batch of users in one pass.
+
+    Each desired user is compared with its current record over USER_DIFF_FIELDS. A field
+    the playbook leaves unset keeps its current value, and roles are compared as sets of
+    role IDs, so every listed role counts and reordering them is not a change.
+
+    Parameters:
+    - desired_users: type List[Dict]: The desired user configs; role_list holds role names.
+    - current_users: type List: The matching current user records; role_list holds role IDs.
+    - role_ids_by_name: type Dict: Maps role names to role IDs.
+
+    Returns:
+    A list of (update_required, update_user_param) tuples, one per user.
+    """
+    diffs = []
+    for desired_user, current_user in zip(desired_users, current_users):
+        update_required = False
+        payload = {}
+        for field in USER_DIFF_FIELDS:
+            desired = desired_user.get(field)
+            current = current_user.get(field)
+            if desired is not None and desired != current:
+                payload[field] = desired
+                update_required = True
+            else:
+                payload[field] = current
+
+        current_roles = current_user.get("role_list") or []
+        role_ids = []
+        for role_name in desired_user.get("role_list") or ():
+            role_id = role_ids_by_name.get(role_name)
+            if role_id is not None and role_id not in role_ids:
+                role_ids.append(role_id)
+
+        # Unset or unresolvable roles leave the user's current roles alone
+        if not role_ids:
+            payload["role_list"] = list(current_roles)
+        else:
+            payload["role_list"] = role_ids
+            if not update_required and set(role_ids) != set(current_roles):
+                update_required = True
+        diffs.append((update_required, payload))
+
+    return diffs
+
+
+def merge_user_configs(configs):
+    """
+    Merges the configs of each username into the state they leave the user in once all are applied.
+
+    Configs for one user apply in playbook order and a field a config leaves unset keeps its
+    value, so each field takes its value from the last config that sets it.
+
+    Parameters:
+    - configs: type List[Dict]: The validated user configs, possibly several per username.
+
+    Returns:
+    A list with one merged config per username, in order of first appearance.
+    """
+    merged = {}
+    for config in configs:
+        merged_config = merged.setdefault(config.get("username"), {})
+        merged_config.update((field, value) for field, value in config.items() if value is not None)
+    return list(merged.values())
+
+
+@lru_cache(maxsize=4096)
+def snake_to_camel_key(snake_str):
+    """Converts one snake_case key to camelCase; results are memoized."""
+    components = snake_str.split('_')
+    return components[0] + ''.join(x.title() for x in components[1:])
+
+
+def convert_keys(data, convert_key):
+    """
+    Copies nested dicts and lists, renaming every dict key with convert_key.
+
+    Walks the tree with an explicit stack, so deep payloads cannot hit the recursion limit.
+
+    Parameters:
+    - data: The value to convert.
+    - convert_key: type Callable: Maps an original key to the new key.
+
+    Returns:
+    The converted copy; scalars are returned unchanged.
+    """
+    if not isinstance(data, (dict, list)):
+        return data
+
+    result = {} if isinstance(data, dict) else []
+    stack = [(data, result)]
+    while stack:
+        source, target = stack.pop()
+        if isinstance(source, dict):
+            items = [(convert_key(key), value) for key, value in source.items()]
+        else:
+            items = [(None, value) for value in source]
+
+        for key, value in items:
+            if isinstance(value, dict):
+                child = {}
+                stack.append((value, child))
+            elif isinstance(value, list):
+                child = []
+                stack.append((value, child))
+            else:
+                child = value
+
+            if key is None:
+                target.append(child)
+            else:
+                target[key] = child
+
+    return result
+
+
+def project_record(record, fields):
+    """
+    Picks only the given snake_case fields out of a camelCase API record.
+
+    Parameters:
+    - record: type Dict: One record from an API response.
+    - fields: type Tuple[str]: The snake_case field names to keep.
+
+    Returns:
+    A dict holding just those fields, keyed in snake_case.
+    """
+    projected = {}
+    for field in fields:
+        camel_field = snake_to_camel_key(field)
+        if camel_field in record:
+            projected[field] = record[camel_field]
+        elif field in record:
+            projected[field] = record[field]
+    return projected
+
+
+# Characters that can still continue a JSON number, up to the end of the buffer
+NUMBER_TAIL = re.compile(r'[0-9.eE+-]*\Z')
+
+
+def iter_json_array(stream, key, chunk_size=65536):
+    """
+    Yields the items of the first JSON array stored under key in a streamed JSON document.
+
+    Only the current chunk and the item being decoded are held in memory, so large
+    responses never have to be loaded or parsed as a whole.
+
+    Parameters:
+    - stream: A file-like object whose read(size) returns bytes or str.
+    - key: type str: The name of the array, e.g. "users".
+    - chunk_size: type int: Number of bytes or characters read at a time.
+    """
+    decoder = json.JSONDecoder()
+    decode_bytes = codecs.getincrementaldecoder("utf-8")().decode
+    array_start = re.compile(r'"{0}"\s*:\s*\['.format(re.escape(key)))
+    state = {"buffer": "", "eof": False}
+
+    def fill():
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            state["eof"] = True
+            return
+        state["buffer"] += decode_bytes(chunk) if isinstance(chunk, bytes) else chunk
+
+    # Skip ahead to the opening bracket, keeping a tail in case the key spans two chunks
+    while True:
+        match = array_start.search(state["buffer"])
+        if match:
+            state["buffer"] = state["buffer"][match.end():]
+            break
+        if state["eof"]:
+            return
+        state["buffer"] = state["buffer"][-(len(key) + 64):]
+        fill()
+
+    position = 0
+    while True:
+        buffer = state["buffer"]
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position == len(buffer):
+            if state["eof"]:
+                return
+            state["buffer"], position = "", 0
+            fill()
+            continue
+        if buffer[position] == "]":
+            return
+
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except ValueError:
+            end = None
+        # A number followed by nothing but number characters up to the buffer's edge may have been
+        # cut in two ('12|345', '1.|5'), so it is only taken once more input or EOF has arrived
+        cut = (end is not None and not state["eof"] and isinstance(item, (int, float))
+               and NUMBER_TAIL.match(buffer, end) is not None)
+        if end is None or cut:
+            if end is None and state["eof"]:
+                raise ValueError("Truncated JSON array '{0}'".format(key))
+            # The item continues in the next chunk
+            state["buffer"], position = buffer[position:], 0
+            fill()
+            continue
+
+        position = end
+        yield item
+        if position > chunk_size:
+            state["buffer"], position = buffer[position:], 0
+
+
+def iter_records(response, collection, fields):
+    """
+    Yields the records of a get_users / get_roles style response, projected onto fields.
+
+    Parameters:
+    - response: Either the parsed response dict or the raw response body as a file-like object.
+    - collection: type str: The list under "response" to read, e.g. "users".
+    - fields: type Tuple[str]: The snake_case fields to keep.
+    """
+    # The SDK's response dicts answer any attribute with None, so a stream is told apart by type
+    if not isinstance(response, dict) and callable(getattr(response, "read", None)):
+        records = iter_json_array(response, collection)
+    else:
+        records = (response.get("response") or {}).get(collection) or []
+
+    for record in records:
+        yield project_record(record, fields)
+
+
+class UserRecord:
+    """Compact record of the user fields this module reads; supports dict-style get() and [] access."""
+
+    __slots__ = USER_FIELDS
+
+    def __init__(self, **fields):
+        for field in USER_FIELDS:
+            setattr(self, field, fields.get(field))
+
+    def get(self, field, default=None):
+        value = getattr(self, field, None)
+        return default if value is None else value
+
+    def __getitem__(self, field):
+        return getattr(self, field)
+
+    def update(self, fields):
+        for field in USER_FIELDS:
+            if fields.get(field) is not None:
+                setattr(self, field, fields[field])
+
+    def __repr__(self):
+        return repr({field: getattr(self, field) for field in USER_FIELDS})
+
+
+class UserDirectory:
+    """
+    In-memory indexes of the users and roles fetched once from Cisco Catalyst Center.
+
+    Users are indexed by username and user_id as the record stream is consumed, so a
+    lookup only reads as far as its user; roles are indexed by name up front. Records
+    are updated in place after create/update calls instead of re-fetching the lists.
+    """
+
+    def __init__(self, user_records, role_records, source=None):
+        self._pending = iter(user_records)
+        self._source = source  # The response body the user records are read from, if streamed
+        self._lock = threading.Lock()
+        self.by_username = {}
+        self.by_user_id = {}
+        self.role_ids_by_name = {}
+        for role in role_records:
+            self.role_ids_by_name[role.get("name")] = role.get("role_id")
+
+    def close(self):
+        """Stops reading the pending user stream and releases its connection."""
+        with self._lock:
+            self._pending = iter(())
+            if self._source is not None:
+                self._source.close()
+                self._source = None
+
+    def _index(self, record):
+        self.by_username.setdefault(record.username, record)
+        if record.user_id is not None:
+            self.by_user_id.setdefault(record.user_id, record)
+
+    def _read_until(self, field, value):
+        # Consumes the pending stream until a record matches; returns None once it is exhausted
+        with self._lock:
+            for user in self._pending:
+                record = UserRecord(**user)
+                self._index(record)
+                if getattr(record, field) == value:
+                    return record
+        return None
+
+    def get_user(self, username):
+        """Returns the UserRecord for username, or None."""
+        return self.by_username.get(username) or self._read_until("username", username)
+
+    def get_user_by_id(self, user_id):
+        """Returns the UserRecord for user_id, or None."""
+        return self.by_user_id.get(user_id) or self._read_until("user_id", user_id)
+
+    def get_role_id(self, role_name):
+        """Returns the role_id for a role name, or None."""
+        return self.role_ids_by_name.get(role_name)
+
+    def upsert_user(self, fields):
+        """
+        Records the outcome of a create/update call.
+
+        Parameters:
+        - fields: type Dict: snake_case user fields; must carry user_id or username.
+
+        Returns:
+        The updated or newly added UserRecord.
+        """
+        record = None
+        if fields.get("user_id") is not None:
+            record = self.get_user_by_id(fields["user_id"])
+        if record is None and fields.get("username") is not None:
+            record = self.get_user(fields["username"])
+
+        with self._lock:
+            if record is None:
+                record = UserRecord(**fields)
+            else:
+                old_username = record.username
+                record.update(fields)
+                if old_username != record.username:
+                    self.by_username.pop(old_username, None)
+            self.by_username[record.username] = record
+            if record.user_id is not None:
+                self.by_user_id[record.user_id] = record
+        return record
+
+
+# Endpoints of the SDK get_users functions whose response body can be streamed, by function name.
+# Users are only streamed when the routed get_users function is listed; others go through the SDK
+USERS_STREAM_ENDPOINTS = {
+    "get_users_ap_i": "/dna/system/api/v1/user",
+    "get_users_api": "/dna/system/api/v1/user",
+    "get_users_api_v1": "/dna/system/api/v1/user",
+}
+
+# Function keys the module routes through version_based_routing, and the ones each state needs
+ROUTE_KEYS = ("get_users", "get_roles", "add_user", "update_user", "delete_user")
+REQUIRED_ROUTE_KEYS = {
+    "merged": ("get_users", "get_roles", "add_user", "update_user"),
+    "deleted": ("get_users", "get_roles", "delete_user"),
+}
+# Route keys whose calls change the controller; _exec turns off their request validation
+# when validate_response_schema is false
+MUTATING_ROUTE_KEYS = ("add_user", "update_user", "delete_user")
 
 
 class User(DnacBase):
@@ -30,6 +493,114 @@ class User(DnacBase):
         self.payload = module.params
         self.log(self.payload)
         self.keymap = {}
+        self.user_directory = None
+        self.stream_session = None  # requests session get_users is streamed on, opened on first use
+        self.routes = self.warmup_routes()
+        self.route_callables = self.bind_routes()
+
+    def warmup_routes(self):
+        """
+        Resolves every SDK function the module calls for the configured Catalyst Center version.
+
+        Runs once at startup so request paths only read self.routes, and fails the module
+        before any API call when the version cannot serve the requested state.
+
+        Returns:
+        A dict mapping each key in ROUTE_KEYS to its SDK function name, or None if undefined.
+        """
+        version = self.payload.get("dnac_version")
+        state = self.payload.get("state")
+        routes = resolve_functions(version, "user_and_roles", ROUTE_KEYS)
+        if routes is None:
+            self.module.fail_json(msg="Catalyst Center version '{0}' is not supported by the user module"
+                                  .format(version))
+
+        missing = [key for key in REQUIRED_ROUTE_KEYS.get(state, ()) if routes.get(key) is None]
+        if missing:
+            self.module.fail_json(msg="Catalyst Center version '{0}' does not provide {1} required for state '{2}'"
+                                  .format(version, ", ".join(missing), state))
+
+        self.log("Resolved routes for version {0}: {1}".format(version, routes), "DEBUG")
+        return routes
+
+    def bind_routes(self):
+        """
+        Binds each resolved route to its method on the SDK's user_and_roles family object.
+
+        Returns:
+        A dict mapping route keys to bound SDK methods. Keys that could not be bound are left
+        out and go through self.dnac._exec instead.
+        """
+        family = getattr(getattr(self.dnac, "api", None), "user_and_roles", None)
+        if family is None:
+            return {}
+
+        route_callables = {}
+        for key, function_name in self.routes.items():
+            method = getattr(family, function_name, None) if function_name else None
+            if method is not None:
+                route_callables[key] = method
+        return route_callables
+
+    def call_route(self, route_key, params=None, fail_on_error=True):
+        """
+        Calls the SDK function behind a route key, directly when it is bound.
+
+        Direct calls follow _exec: request validation is turned off for mutating calls when
+        validate_response_schema is false, a response carrying an executionId is polled until
+        its business API execution ends, the call is retried after RATE_LIMIT_RETRY_AFTER
+        seconds when that execution was rate limited, and SDK errors fail the module with
+        _exec's message.
+
+        Parameters:
+        - route_key: type str: A key from ROUTE_KEYS.
+        - params: type Dict: Keyword arguments for the SDK function.
+        - fail_on_error: type bool: Fail the module on an SDK error; if False the error is
+          raised to the caller instead.
+
+        Returns:
+        The SDK response.
+        """
+        method = self.route_callables.get(route_key)
+        if method is None:
+            return self.dnac._exec(
+                family="user_and_roles",
+                function=self.routes[route_key],
+                op_modifies=True,
+                params=params,
+            )
+
+        if params and route_key in MUTATING_ROUTE_KEYS and not self.dnac.validate_response_schema:
+            params = dict(params, active_validation=False)
+        try:
+            response = method(**params) if params else method()
+            execution_id = response.get("executionId") if response and isinstance(response, dict) else None
+            while execution_id:
+                execution_details = self.dnac.api.task.get_business_api_execution_details(execution_id=execution_id)
+                if execution_details.get("status") == "SUCCESS":
+                    break
+                bapi_error = execution_details.get("bapiError")
+                if bapi_error:
+                    if RATE_LIMIT_MESSAGE in bapi_error:
+                        self.log("{0}, retrying '{1}' in {2} seconds".format(
+                            RATE_LIMIT_MESSAGE, self.routes[route_key], RATE_LIMIT_RETRY_AFTER), "WARNING")
+                        time.sleep(RATE_LIMIT_RETRY_AFTER)
+                        return self.call_route(route_key, params, fail_on_error)
+                    self.log(bapi_error, "DEBUG")
+                    break
+            return response
+        except Exception as e:
+            if not fail_on_error:
+                raise
+            response = getattr(e, "response", None)
+            if getattr(response, "status_code", None) is not None:
+                error = "status_code: {0},  {1}".format(response.status_code, response.text)
+            else:
+                error = str(e)
+            self.msg = ("An error occured when executing operation for the family 'user_and_roles' "
+                        "having the function '{0}'. The error was: {1}").format(self.routes[route_key], error)
+            self.log(self.msg, "ERROR")
+            self.module.fail_json(msg=self.msg)
 
     # Below function used to validate input over the ansible validation
     def validate_input_yml(self):
@@ -44,18 +615,21 @@ class User(DnacBase):
         
         userlist = self.payload.get("config")
         userlist = self.camel_to_snake_case(userlist)
-        user_details = dict(first_name = dict(required = False, type = 'str'),
-                    last_name = dict(required = False, type = 'str'),
-                    email = dict(required = False, type = 'str'),
-                    password = dict(required = False, type = 'str'),
-                    username = dict(required = True, type = 'str'),
-                    role_list = dict(required = False, type = 'list', elements='str'),
-                    )
-        valid_param, invalid_param = validate_list_of_dicts(userlist, user_details)
+        valid_param, invalid_param = validate_list_of_dicts(userlist, USER_CONFIG_SPEC)
 
         if invalid_param:
-            self.msg("Invalid param found in playbook: '{0}' "
-                            .format(", ".join(invalid_param)))
+            self.msg = "Invalid param found in playbook: '{0}' ".format(", ".join(invalid_param))
+            self.log(self.msg, "ERROR")
+            self.status = "failed"
+            return self
+
+        # Check every entry's values up front so a bad entry fails the run before any API call
+        entry_errors = USER_CONFIG_VALIDATOR.validate_many(valid_param)
+        if entry_errors:
+            self.msg = "Invalid parameters in playbook config: '{0}' ".format("\n".join(
+                "config[{0}] ({1}): {2}".format(index, valid_param[index].get("username"), "; ".join(errors))
+                for index, errors in sorted(entry_errors.items())
+            ))
             self.log(self.msg, "ERROR")
             self.status = "failed"
             return self
@@ -68,37 +642,7 @@ class User(DnacBase):
 
     def valid_user_config_parameters(self, user_config):
 
-        errormsg = []
-
-        if user_config.get("first_name"):
-            param_spec = dict(type = "str", length_max = 255)
-            validate_str(user_config["first_name"], param_spec, "first_name",
-                            errormsg)
-
-        if user_config.get("last_name"):
-            param_spec = dict(type = "str", length_max = 255)
-            validate_str(user_config["last_name"], param_spec, "last_name",
-                            errormsg)
-
-        if user_config.get("email"):
-            email_regex = re.compile(r"[^@]+@[^@]+\.[^@]+")
-            if not email_regex.match(user_config["email"]):
-                errormsg.append("email: Invalid email format for email: '{0}'".format(user_config["email"]))
-
-        if user_config.get("password"):
-            password_regex = re.compile(r'^(?=.*[A-Z])(?=.*[a-z])(?=.*\d)(?=.*[@$!%*?&])[A-Za-z\d@$!%*?&]{8,}$')
-            if not password_regex.match(user_config["password"]):
-                errormsg.append("password: Password does not meet complexity requirements for password: '{0}'".format(user_config["password"]))
-
-        if user_config.get("username"):
-            param_spec = dict(type = "str", length_max = 255)
-            validate_str(user_config["username"], param_spec, "username",
-                            errormsg)
-
-        if user_config.get("role_list"):
-            param_spec = dict(type = "list", elements="str")
-            validate_list(user_config["role_list"], param_spec, "role_list",
-                            errormsg)
+        errormsg = USER_CONFIG_VALIDATOR.validate(user_config)
 
         if len(errormsg) > 0:
             self.msg = "Invalid parameters in playbook config: '{0}' "\
@@ -148,9 +692,39 @@ class User(DnacBase):
 
     def get_diff_merged(self, config):
 
-        config_updated = False
-        config_created = False
-        task_response = None
+        operation = self.plan_merged_operation(config)
+        if operation is None:
+            return self
+
+        (action, user_params) = operation
+        responses = {}
+
+        if action == "update":
+            task_response = self.update_user(user_params)
+            task_res = str(task_response)
+            self.log('Task respoonse {}'.format(str(task_res)),"INFO")
+        else:
+            task_response = self.create_user(user_params)
+            self.log('Task response {}'.format(str(task_response)), "INFO")
+
+        responses["users_operation"] = {"response": task_response}
+        self.msg = responses
+        self.result['response'] = self.msg
+        self.status = "success"
+        self.log(self.msg, "INFO")
+
+        return self
+
+    def plan_merged_operation(self, config):
+        """
+        Works out the API call needed to bring one user config to the merged state.
+
+        Parameters:
+        - config: type Dict: The validated user config; self.want and self.have must be set for it.
+
+        Returns:
+        A tuple of ("create" or "update", user_params), or None if the user needs no update.
+        """
         # check if the given user config exists and/or needs to be updated/created.
 
         if self.have.get("user_exists"):
@@ -167,16 +741,13 @@ class User(DnacBase):
                 self.result['msg'] = self.msg
                 self.result["response"].append(responses)
                 self.result["skipped"] = True
-                return self
+                return None
             user_in_have = self.have["current_user_config"]
             update_param = update_required_param
             update_param["user_id"] = user_in_have.get("user_id")
             self.log('Final user data to update {}'.format(str(update_param)),
                   "INFO")
-            task_response = self.update_user(update_param)
-            task_res = str(task_response)
-            self.log('Task respoonse {}'.format(str(task_res)),"INFO")
-            config_updated = True
+            return ("update", update_param)
 
         else:
             # Create the user
@@ -207,26 +778,91 @@ class User(DnacBase):
                 self.log("""The user '{0}' does not need additional filtering for 'None' values \
                          in the 'user_params' dictionary.""".format(user_name), "INFO")
 
-            task_response = self.create_user(user_params)
-            self.log('Task response {}'.format(str(task_response)), "INFO")
-            config_created = True
-
-        responses = {}
-            
-        if config_updated:
-            responses["users_operation"] = {"response": task_response}
-            self.msg = responses
-            self.result['response'] = self.msg
-            self.status = "success"
-            self.log(self.msg, "INFO")
+            return ("create", dict(user_params))
+
+    def apply_merged_batch(self, configs, concurrency_limit):
+        """
+        Brings every user config to the merged state, issuing the create/update calls concurrently.
+
+        Configs are applied in rounds: round k holds the k-th config of every username, so
+        the calls within a round touch distinct users and run in parallel, while configs
+        for the same user apply in playbook order. Each round is planned against the user
+        snapshot as updated by the rounds before it, as the serial path would see it.
+
+        Parameters:
+        - configs: type List[Dict]: The validated user configs.
+        - concurrency_limit: type int: Maximum number of API calls in flight at once.
+
+        Returns:
+        self, with one entry per applied config in self.result["response"].
+        """
+        rounds = []
+        occurrences = {}
+        for config in configs:
+            username = config.get("username")
+            occurrence = occurrences.get(username, 0)
+            occurrences[username] = occurrence + 1
+            if occurrence == len(rounds):
+                rounds.append([])
+            rounds[occurrence].append(config)
+
+        def apply_operation(operation):
+            (username, action, user_params) = operation
+            # Errors are collected per user here rather than failing the module from a worker thread
+            try:
+                if action == "update":
+                    return (username, action, self.update_user(user_params, fail_on_error=False), None)
+                return (username, action, self.create_user(user_params, fail_on_error=False), None)
+            except Exception as e:
+                return (username, action, None, str(e))
+
+        applied = 0
+        failed = []
+        for round_configs in rounds:
+            operations = []
+            for config in round_configs:
+                # A user whose earlier config failed is left as it is
+                if config.get("username") in failed:
+                    continue
+                self.reset_values()
+                self.get_want(config).check_return_status()
+                self.get_have(config).check_return_status()
+                operation = self.plan_merged_operation(config)
+                if operation is not None:
+                    operations.append((config.get("username"),) + operation)
+            if not operations:
+                continue
+
+            workers = max(1, min(concurrency_limit, len(operations)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for (username, action, task_response, error) in executor.map(apply_operation, operations):
+                    if error:
+                        failed.append(username)
+                        self.log("Failed to {0} user '{1}': {2}".format(action, username, error), "ERROR")
+                    else:
+                        applied += 1
+                    self.result["response"].append({
+                        "users_operation": {
+                            "username": username,
+                            "operation": action,
+                            "response": task_response,
+                            "error": error,
+                        }
+                    })
+
+        if failed:
+            self.msg = "Failed to apply the config for user(s): {0}".format(", ".join(failed))
+            self.log(self.msg, "ERROR")
+            self.status = "failed"
+            return self
 
-        if config_created:
-            responses["users_operation"] = {"response": task_response}
-            self.msg = responses
-            self.result['response'] = self.msg
+        if not applied:
             self.status = "success"
-            self.log(self.msg, "INFO")
+            return self
 
+        self.msg = "Applied the config for {0} user(s)".format(applied)
+        self.log(self.msg, "INFO")
+        self.status = "success"
         return self
 
     def get_current_config(self, input_config):
@@ -249,132 +885,205 @@ class User(DnacBase):
             self.log("Required param username or role_list is not in playbook config", "ERROR")
             return (user_exists, current_user_configuration, current_role_configuration)
         
-        function_get_user = "get_users"
-        version = self.payload.get("dnac_version")
-        VBR_funtion_get_user = call_function(version, 'user_and_roles', function_get_user)
-        self.log(f"VBR_funtion : {VBR_funtion_get_user}")
+        # Users and roles are fetched once per run and shared by every config entry
+        self.load_users_and_roles()
+        if self.user_directory is None:
+            return (user_exists, role_exists, current_user_configuration, current_role_configuration)
+
+        user = self.user_directory.get_user(input_config.get("username"))
+        if user is not None:
+            current_user_configuration = user
+            user_exists = True
+
+        if input_config.get("role_list") != None:
+            for role_name in input_config.get("role_list"):
+                role_id = self.user_directory.get_role_id(role_name)
+                if role_id is not None:
+                    current_role_configuration[role_name] = role_id
+                    role_exists = True
 
-        function_get_role = "get_roles"
-        version = self.payload.get("dnac_version")
-        VBR_funtion_get_role = call_function(version, 'user_and_roles', function_get_role)
-        self.log(f"VBR_funtion : {VBR_funtion_get_role}")
+        return (user_exists, role_exists, current_user_configuration, current_role_configuration)
 
-        try:
+    def load_users_and_roles(self, refresh=False):
+        """
+        Fetches all users and roles from Cisco Catalyst Center and indexes them by name.
 
-            response_user = self.dnac._exec(
-                family="user_and_roles",
-                function= VBR_funtion_get_user,
-                op_modifies=True,
-                params={**input_param, 'invoke_source': 'external', 'auth_source': 'internal'},
-            )
+        User records are indexed lazily: a lookup only walks the response until it finds its user.
 
-            response_role = self.dnac._exec(
-                family="user_and_roles",
-                function=VBR_funtion_get_role,
-                op_modifies=True,
-            )
+        Parameters:
+        - refresh: type bool: Fetch again even if the indexes are already loaded.
+
+        Returns:
+        self, with user_directory set, or left as None if the fetch failed.
+        """
+        if self.user_directory is not None:
+            if not refresh:
+                return self
+            # A partly read user stream holds its connection until closed
+            self.user_directory.close()
+            self.user_directory = None
+
+        response_user = None
+        response_role = None
+        try:
+            # Roles come first: the SDK call logs in, which the streamed request relies on
+            response_role = self.call_route("get_roles", fail_on_error=False)
+            response_user = self.stream_users({'invokeSource': 'external', 'authSource': 'internal'})
+            if response_user is None:
+                response_user = self.call_route(
+                    "get_users", {'invoke_source': 'external', 'auth_source': 'internal'}, fail_on_error=False
+                )
 
         except Exception as e:
-            self.log("The provided user '{0}' is either invalid or not present in the Cisco Catalyst Center."\
-                     .format(str(input_param) + str(e)), "WARNING")
-
-        if response_user and response_role:
-            response_user = self.camel_to_snake_case(response_user)
-            response_role = self.camel_to_snake_case(response_role)
-            current_user_configuration = {}
-            current_role_configuration = {}
-            self.log("Received API response from 'get_users_api': {0}".format(str(response_user)), "DEBUG")
-            self.log("Received API response from 'get_roles_api': {0}".format(str(response_role)), "DEBUG")
-
-            users = response_user.get("response", {}).get("users", [])
-            roles = response_role.get("response", {}).get("roles", [])
-
-            for user in users:
-                if user.get("username") == input_config.get("username"):
-                    current_user_configuration = user
-                    user_exists = True
-
-            if input_config.get("role_list") != None:
-              for role in roles:
-                  if role.get("name") in input_config.get("role_list"):
-                      current_role_configuration[role.get("name")] = role.get("role_id")
-                      role_exists = True
+            self.log("Unable to fetch users and roles from the Cisco Catalyst Center: {0}".format(str(e)), "WARNING")
 
-        return (user_exists, role_exists, current_user_configuration, current_role_configuration)
+        streamed = response_user is not None and not isinstance(response_user, dict)
+        if not (response_user and response_role):
+            if streamed:
+                response_user.close()
+            return self
 
-    def create_user(self, user_params):
-        function_add_user = "add_user"
-        version = self.payload.get("dnac_version")
-        VBR_funtion_add_user = call_function(version, 'user_and_roles', function_add_user)
-        self.log(f"VBR_funtion : {VBR_funtion_add_user}")
+        # Only the fields the diff reads are converted, not the whole response tree
+        self.user_directory = UserDirectory(
+            iter_records(response_user, "users", USER_FIELDS),
+            iter_records(response_role, "roles", ROLE_FIELDS),
+            source=response_user if streamed else None,
+        )
+        self.log("Received users from 'get_users_api' and {0} roles from 'get_roles_api'"
+                 .format(len(self.user_directory.role_ids_by_name)), "DEBUG")
+        return self
+
+    def stream_users(self, params):
+        """
+        Opens the get_users response body as a byte stream, so users can be read without loading it whole.
+
+        Every SDK request path reads the response body in full, so when the routed get_users
+        function has a known endpoint in USERS_STREAM_ENDPOINTS, it is requested on the module's
+        own keep-alive requests session, with the SDK session's base URL, headers (auth token
+        included) and TLS settings. The SDK logs in on the get_roles call made before this one.
+
+        Parameters:
+        - params: type Dict: The get_users query parameters, in camelCase.
+
+        Returns:
+        A file-like object over the raw JSON body, or None if the body cannot be streamed; the
+        caller then fetches the users through the SDK.
+        """
+        endpoint = USERS_STREAM_ENDPOINTS.get(self.routes.get("get_users"))
+        session = getattr(getattr(self.dnac, "api", None), "session", None)
+        if endpoint is None or session is None or requests is None:
+            return None
 
+        try:
+            if self.stream_session is None:
+                self.stream_session = requests.Session()
+            response = self.stream_session.get(
+                session.abs_url(endpoint), params=params, headers=session.headers,
+                verify=session.verify, timeout=session.single_request_timeout, stream=True,
+            )
+        except Exception as e:
+            self.log("Unable to stream users from the Cisco Catalyst Center: {0}".format(str(e)), "WARNING")
+            return None
+
+        # Anything but a plain 200 (an expired token, rate limiting) is left to the SDK's own handling
+        if response.status_code != 200:
+            self.log("Streaming users returned HTTP {0}, fetching them through the SDK".format(response.status_code), "DEBUG")
+            response.close()
+            return None
+        response.raw.decode_content = True
+        return response.raw
+
+    def create_user(self, user_params, fail_on_error=True):
         user_info_params= self.snake_to_camel_case(user_params)
         self.log("Create user with user_info_params: {0}".format(str(user_info_params)), "DEBUG")
-        response = self.dnac._exec(
-            family="user_and_roles",
-            function=VBR_funtion_add_user,
-            op_modifies=True,
-            params=user_info_params,
-        )
+        response = self.call_route("add_user", user_info_params, fail_on_error)
         self.log("Received API response from 'create_user': {0}".format(str(response)), "DEBUG")
+
+        if self.user_directory is not None and isinstance(response, dict):
+            user_id = (response.get("response") or {}).get("userId")
+            self.user_directory.upsert_user(dict(user_params, user_id=user_id))
         return response
     
     def user_requires_update(self, current_user, current_role):
 
-        update_required = False
-        update_user_param = {}
-
-        if current_user.get('first_name') != self.want.get('first_name'):
-            update_user_param['first_name'] = self.want['first_name']
-            update_required = True
-        elif 'first_name' not in update_user_param:
-            update_user_param['first_name'] = current_user['first_name']
-        
-        if current_user.get('last_name') != self.want.get('last_name'):
-            update_user_param['last_name'] = self.want['last_name']
-            update_required = True
-        elif 'last_name' not in update_user_param:
-            update_user_param['last_name'] = current_user['last_name']
-        
-        if current_user.get('email') != self.want.get('email'):
-            update_user_param['email'] = self.want['email']
-            update_required = True
-        elif 'email' not in update_user_param:
-            update_user_param['email'] = current_user['email']
-        
-        if current_user.get('username') != self.want.get('username'):
-            update_user_param['username'] = self.want['username']
-            update_required = True
-        elif 'username' not in update_user_param:
-            update_user_param['username'] = current_user['username']
-        
-        if current_user.get('role_list')[0] != current_role[self.want.get("role_list")[0]]:
-            role_id = current_role[self.want.get("role_list")[0]]
-            update_user_param['role_list'] = [role_id]
-            update_required = True
-        elif 'role_list' not in update_user_param:
-            update_user_param['role_list'] = [current_role[self.want.get("role_list")[0]]]
-
+        (update_required, update_user_param) = diff_user_batch([self.want], [current_user], current_role)[0]
         return (update_required,update_user_param)
 
-    def update_user(self, user_params):
-
-        function_update_user = "update_user"
-        version = self.payload.get("dnac_version")
-        VBR_funtion_update_user = call_function(version, 'user_and_roles', function_update_user)
-        self.log(f"VBR_funtion : {VBR_funtion_update_user}")
-
+    def update_user(self, user_params, fail_on_error=True):
         user_info_params= self.snake_to_camel_case(user_params)
         self.log("Update user with user_info_params: {0}".format(str(user_info_params)), "DEBUG")
-        response = self.dnac._exec(
-            family="user_and_roles",
-            function=VBR_funtion_update_user,
-            op_modifies=True,
-            params=user_info_params,
-        )
+        response = self.call_route("update_user", user_info_params, fail_on_error)
         self.log("Received API response from 'update_user': {0}".format(str(response)), "DEBUG")
+
+        if self.user_directory is not None:
+            self.user_directory.upsert_user(user_params)
         return response
 
+    def unconverged_configs(self, configs):
+        """
+        Checks the loaded user snapshot against a batch of configs.
+
+        Parameters:
+        - configs: type List[Dict]: The validated user configs.
+
+        Returns:
+        The configs whose user is missing or still needs an update.
+        """
+        if self.user_directory is None:
+            return list(configs)
+
+        missing = []
+        present = []
+        current_users = []
+        for config in configs:
+            current_user = self.user_directory.get_user(config.get("username"))
+            if current_user is None:
+                missing.append(config)
+            else:
+                present.append(config)
+                current_users.append(current_user)
+
+        diffs = diff_user_batch(present, current_users, self.user_directory.role_ids_by_name)
+        return missing + [config for config, (update_required, _) in zip(present, diffs) if update_required]
+
+    def wait_for_merged_state(self, configs):
+        """
+        Polls Cisco Catalyst Center until every user config has been applied, or config_verify_timeout expires.
+
+        Configs for the same user are merged first, so the wait is for each user's final state
+        rather than for an earlier config a later one overrides. Each round re-fetches the user
+        and role lists once for all pending users. The first check is immediate; later ones back
+        off exponentially from dnac_task_poll_interval, with jitter so concurrent runs do not
+        poll in lockstep.
+
+        Parameters:
+        - configs: type List[Dict]: The validated user configs to wait for.
+
+        Returns:
+        True if every config converged before the timeout, False otherwise.
+        """
+        poll_interval = max(self.params.get("dnac_task_poll_interval") or 1, 0.1)
+        timeout = min(self.params.get("config_verify_timeout"), self.params.get("dnac_api_task_timeout"))
+        deadline = time.time() + timeout
+        delay = poll_interval
+        pending = merge_user_configs(configs)
+
+        while True:
+            self.load_users_and_roles(refresh=True)
+            pending = self.unconverged_configs(pending)
+            if not pending:
+                self.log("All {0} user config(s) are reflected in the Cisco Catalyst Center".format(len(configs)), "INFO")
+                return True
+
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                self.log("Timed out waiting for user(s) {0} to be reflected in the Cisco Catalyst Center"
+                         .format(", ".join(str(config.get("username")) for config in pending)), "WARNING")
+                return False
+
+            time.sleep(min(delay / 2 + random.uniform(0, delay / 2), remaining))
+            delay = min(delay * 2, poll_interval * 32)
+
     def verify_diff_merged(self, config):
 
         self.get_have(config)
@@ -412,27 +1121,7 @@ class User(DnacBase):
             Returns:
             A new dictionary with keys converted to camel case.
             """
-            def to_camel_case(snake_str):
-                components = snake_str.split('_')
-                return components[0] + ''.join(x.title() for x in components[1:])
-
-            if isinstance(data, dict):
-                camel_case_data = {}
-                for key, value in data.items():
-                    new_key = to_camel_case(key)
-
-                    if isinstance(value, dict):
-                        camel_case_data[new_key] = self.snake_to_camel_case(value)
-                    elif isinstance(value, list):
-                        camel_case_data[new_key] = [self.snake_to_camel_case(item) if isinstance(item, dict) else item for item in value]
-                    else:
-                        camel_case_data[new_key] = value
-
-                return camel_case_data
-            elif isinstance(data, list):
-                return [self.snake_to_camel_case(item) if isinstance(item, dict) else item for item in data]
-            else:
-                return data
+            return convert_keys(data, snake_to_camel_key)
 
 
 def main():
@@ -450,9 +1139,11 @@ def main():
                     'dnac_log_level': {'type': 'str', 'default': 'WARNING'},
                     "dnac_log_file_path": {"type": 'str', "default": 'dnac.log'},
                     'config_verify': {'type': 'bool', "default": False},
+                    'config_verify_timeout': {'type': 'int', "default": 30},
                     "dnac_log_append": {"type": 'bool', "default": True},
                     'dnac_api_task_timeout': {'type': 'int', "default": 1200},
                     'dnac_task_poll_interval': {'type': 'int', "default": 2},
+                    'concurrency_limit': {'type': 'int', "default": 1},
                     'config': {'required': True, 'type': 'list', 'elements': 'dict'},
                     'validate_response_schema': {'type': 'bool', 'default': True},
                     'state': {'default': 'merged', 'choices': ['merged', 'deleted']}
@@ -473,15 +1164,23 @@ def main():
 
     ccc_user.validate_input_yml().check_return_status()
     config_verify = ccc_user.params.get("config_verify")
-
-    for config in ccc_user.validated_config:
-        ccc_user.reset_values()
-        ccc_user.get_want(config).check_return_status()
-        ccc_user.get_have(config).check_return_status()
-        ccc_user.get_diff_state_apply[state](config).check_return_status()
-        
-        if config_verify:
-            time.sleep(5)
+    concurrency_limit = ccc_user.params.get("concurrency_limit")
+
+    if state == "merged" and concurrency_limit > 1:
+        ccc_user.apply_merged_batch(ccc_user.validated_config, concurrency_limit).check_return_status()
+    else:
+        for config in ccc_user.validated_config:
+            ccc_user.reset_values()
+            ccc_user.get_want(config).check_return_status()
+            ccc_user.get_have(config).check_return_status()
+            ccc_user.get_diff_state_apply[state](config).check_return_status()
+
+    if config_verify:
+        if state == "merged":
+            ccc_user.wait_for_merged_state(ccc_user.validated_config)
+        for config in ccc_user.validated_config:
+            ccc_user.reset_values()
+            ccc_user.get_want(config).check_return_status()
             ccc_user.verify_diff_state_apply[state](config).check_return_status()
 
     module.exit_json(**ccc_user.result)
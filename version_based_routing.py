@@ -1,22 +1,443 @@
+import argparse
+import bisect
 import importlib
-import inspect
+import importlib.util
+import itertools
+import json
+import math
+import os
 import pkgutil
 import difflib
+import heapq
+import re
+import sqlite3
+import types
+import weakref
+from collections import Counter, OrderedDict
+
+
+class RouteTable:
+    """Bounded LRU table mapping (version, family, hint) to a resolved function name."""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._routes = OrderedDict()
+
+    def get(self, version, family, hint):
+        """Returns the cached function name for the route, or None on a miss."""
+        key = (version, family, hint)
+        try:
+            function_name = self._routes[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._routes.move_to_end(key)
+        self.hits += 1
+        return function_name
+
+    def put(self, version, family, hint, function_name):
+        """Caches a resolved route, evicting the least recently used one when full."""
+        key = (version, family, hint)
+        self._routes[key] = function_name
+        self._routes.move_to_end(key)
+        if len(self._routes) > self.maxsize:
+            self._routes.popitem(last=False)
+
+    def invalidate(self, version=None, family=None):
+        """Drops every route, or only those matching the given version and/or family."""
+        if version is None and family is None:
+            removed = len(self._routes)
+            self._routes.clear()
+            return removed
+        stale = [key for key in self._routes
+                 if (version is None or key[0] == version) and (family is None or key[1] == family)]
+        for key in stale:
+            del self._routes[key]
+        return len(stale)
+
+    def stats(self):
+        """Returns the hit/miss counters and current size of the table."""
+        return {"hits": self.hits, "misses": self.misses,
+                "size": len(self._routes), "maxsize": self.maxsize}
+
+
+route_table = RouteTable()
+
+# Bump whenever family or hint resolution changes, so routes cached by an older resolver are discarded
+ROUTE_RESOLVER_VERSION = 2
+
+
+def get_sdk_fingerprint():
+    """Identifies the installed dnacentersdk and this resolver by location, versions and file timestamps, without importing the SDK."""
+    spec = importlib.util.find_spec("dnacentersdk")
+    if spec is None or not spec.origin:
+        return None
+
+    package_path = os.path.dirname(spec.origin)
+    try:
+        from importlib.metadata import version as distribution_version
+        sdk_version = distribution_version("dnacentersdk")
+    except Exception:
+        sdk_version = "unknown"
+
+    # Reinstalling or upgrading rewrites these, so their mtimes change with the install
+    stamps = []
+    for path in (spec.origin, os.path.join(package_path, "api")):
+        try:
+            stamps.append(str(os.stat(path).st_mtime_ns))
+        except OSError:
+            stamps.append("-")
+
+    return "{}|{}|{}|resolver-{}".format(package_path, sdk_version, ":".join(stamps), ROUTE_RESOLVER_VERSION)
+
+
+class PersistentRouteCache:
+    """SQLite-backed route cache shared by every process using the same file, scoped to one SDK install."""
+
+    def __init__(self, path, fingerprint):
+        self.path = path
+        self.fingerprint = fingerprint
+        # Opened on first use, and again in a forked child, which must not use its parent's connection
+        self._connection = None
+        self._pid = None
+
+    def _connect(self):
+        """Returns this process's connection, opening it on first use and after a fork."""
+        pid = os.getpid()
+        if self._pid == pid:
+            return self._connection
+        # WAL lets forked workers read while another one writes; busy writers wait instead of failing
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS routes ("
+                "fingerprint TEXT, version TEXT, family TEXT, hint TEXT, function_name TEXT, "
+                "PRIMARY KEY (fingerprint, version, family, hint))"
+            )
+            # Routes resolved against any other SDK install are stale. Deleting takes the write lock
+            # even when nothing matches, so only do it when such a route exists
+            if connection.execute("SELECT 1 FROM routes WHERE fingerprint != ? LIMIT 1", (self.fingerprint,)).fetchone():
+                connection.execute("DELETE FROM routes WHERE fingerprint != ?", (self.fingerprint,))
+        except sqlite3.Error:
+            connection.close()
+            raise
+        self._connection, self._pid = connection, pid
+        return connection
+
+    def get(self, version, family, hint):
+        """Returns the stored function name for the route, or None, also when the database cannot be read."""
+        try:
+            row = self._connect().execute(
+                "SELECT function_name FROM routes WHERE fingerprint = ? AND version = ? AND family = ? AND hint = ?",
+                (self.fingerprint, version, family, hint),
+            ).fetchone()
+        except sqlite3.Error as e:
+            # A locked, unreadable or corrupt cache only costs a resolve
+            print("Route cache '{}' lookup failed: {}.".format(self.path, e))
+            return None
+        return row[0] if row else None
+
+    def put(self, version, family, hint, function_name):
+        """Stores a resolved route for later processes; a failed write is reported and skipped."""
+        try:
+            self._connect().execute(
+                "INSERT OR REPLACE INTO routes VALUES (?, ?, ?, ?, ?)",
+                (self.fingerprint, version, family, hint, function_name),
+            )
+        except sqlite3.Error as e:
+            print("Route cache '{}' write failed: {}.".format(self.path, e))
+
+    def invalidate(self):
+        """Drops every stored route."""
+        self._connect().execute("DELETE FROM routes")
+
+    def close(self):
+        # A connection inherited from the parent is left to the parent
+        if self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+        self._pid = None
+
+
+def open_persistent_route_cache(path=None):
+    """Returns the on-disk route cache at path or $VBR_ROUTE_CACHE, opened on first use; None when disabled or the SDK is missing."""
+    path = path or os.environ.get("VBR_ROUTE_CACHE")
+    if not path:
+        return None
+    fingerprint = get_sdk_fingerprint()
+    if fingerprint is None:
+        return None
+    return PersistentRouteCache(path, fingerprint)
+
+
+persistent_route_cache = open_persistent_route_cache()
+
+
+class FamilyMatcher:
+    """Per-version family matcher returning the same results as difflib.get_close_matches, memoized per query."""
+
+    def __init__(self, families):
+        self.families = list(families)
+        self._names = set(self.families)
+        self._lengths = [len(family) for family in self.families]
+        self._matches = {}
+        # Each family gets a field of whole bytes in one integer, wide enough that no shared count carries
+        # into the next field and the field's top bit is free, so one addition updates every family
+        self._field_bytes = (max(self._lengths, default=0).bit_length() + 8) // 8
+        self._field_bits = self._field_bytes * 8
+        self._top_bits = self._pack([1 << (self._field_bits - 1)] * len(self.families))
+        self._shared = {}
+        self._cutoff_offsets = {}
+
+    def _pack(self, values):
+        # One integer holding values[i] in the i-th family's field
+        if self._field_bytes == 1:
+            return int.from_bytes(bytes(values), "little")
+        return int.from_bytes(b"".join(value.to_bytes(self._field_bytes, "little") for value in values), "little")
+
+    def _shared_counts(self, char, count):
+        # min(count, occurrences of char) in every family's field, built on first use so a matcher
+        # costs nothing to create in a process that only resolves a hint or two
+        key = (char, count)
+        shared = self._shared.get(key)
+        if shared is None:
+            occurrences = map(str.count, self.families, itertools.repeat(char))
+            if self._field_bytes == 1:
+                # Byte fields: cap every count at once with a translation table mapping x to min(x, count)
+                capped = bytes(range(count)) + bytes([count]) * (256 - count)
+                shared = int.from_bytes(bytes(occurrences).translate(capped), "little")
+            else:
+                shared = self._pack([min(occurrence, count) for occurrence in occurrences])
+            self._shared[key] = shared
+        return shared
+
+    def _cutoff_offset(self, query_length, cutoff):
+        # Per field, 2 ** (field_bits - 1) less the fewest shared characters whose quick_ratio bound reaches
+        # the cutoff, so adding it to the shared counts sets a field's top bit exactly when its bound does
+        key = (query_length, cutoff)
+        offset = self._cutoff_offsets.get(key)
+        if offset is None:
+            offsets = {}
+            for length in set(self._lengths):
+                total = length + query_length
+                if not total:
+                    needed = 0  # difflib rates two empty names 1.0
+                else:
+                    # Start just below the exact threshold and settle it with the comparison _candidates makes
+                    needed = max(0, math.ceil(cutoff * total / 2.0) - 1)
+                    while needed <= length and 2.0 * needed / total < cutoff:
+                        needed += 1
+                offsets[length] = (1 << (self._field_bits - 1)) - needed if needed <= length else 0
+            offset = self._cutoff_offsets[key] = self._pack(list(map(offsets.get, self._lengths)))
+        return offset
+
+    def _candidates(self, family, cutoff):
+        # Shared character counts give the same upper bound as SequenceMatcher.quick_ratio
+        shared_counts = 0
+        for char, count in Counter(family).items():
+            shared_counts += self._shared_counts(char, count)
+
+        query_length = len(family)
+        field_mask = (1 << self._field_bits) - 1
+        reached = (shared_counts + self._cutoff_offset(query_length, cutoff)) & self._top_bits
+        candidates = []
+        while reached:
+            top_bit = reached & -reached
+            reached ^= top_bit
+            index = top_bit.bit_length() // self._field_bits - 1
+            shared = (shared_counts >> (self._field_bits * index)) & field_mask
+            total = self._lengths[index] + query_length
+            candidates.append((2.0 * shared / total if total else 1.0, self.families[index]))
+        candidates.sort(reverse=True)
+        return candidates
+
+    @staticmethod
+    def _matching_characters(name, query):
+        # Sum of SequenceMatcher(None, name, query).get_matching_blocks() sizes for a query under 200 characters,
+        # where difflib treats nothing as junk: the longest common block, earliest in name and then in the
+        # query, then the same on either side of it. Substring tests find each block in one pass over name
+        matched = 0
+        ranges = [(0, len(name), 0, len(query))]
+        while ranges:
+            name_start, name_end, query_start, query_end = ranges.pop()
+            query_range = query[query_start:query_end]
+            block_start, block_size = name_start, 0
+            i = name_start
+            while i + block_size < name_end:
+                if name[i:i + block_size + 1] in query_range:
+                    block_start, block_size = i, block_size + 1
+                else:
+                    i += 1
+            if block_size:
+                matched += block_size
+                j = query_start + query_range.find(name[block_start:block_start + block_size])
+                if name_start < block_start and query_start < j:
+                    ranges.append((name_start, block_start, query_start, j))
+                if block_start + block_size < name_end and j + block_size < query_end:
+                    ranges.append((block_start + block_size, name_end, j + block_size, query_end))
+        return matched
+
+    def get_close_matches(self, family, n=3, cutoff=0.6):
+        """Returns up to n family names whose similarity ratio to family is at least cutoff, best first."""
+        key = (family, n, cutoff)
+        if key in self._matches:
+            return self._matches[key]
+
+        # Only an identical name scores 1.0, so it is the single best match without scoring anything
+        if n == 1 and family in self._names:
+            self._matches[key] = [family]
+            return self._matches[key]
+
+        # Score best bound first and stop once nothing left can enter the top n. difflib junks a query's
+        # popular characters from 200 characters on, so only shorter queries are scored here
+        query_length = len(family)
+        matcher = difflib.SequenceMatcher(None, "", family) if query_length >= 200 else None
+        best = []
+        for bound, name in self._candidates(family, cutoff):
+            if len(best) == n and best[0][0] > bound:
+                break
+            if matcher is None:
+                total = len(name) + query_length
+                score = 2.0 * self._matching_characters(name, family) / total if total else 1.0
+            else:
+                matcher.set_seq1(name)
+                score = matcher.ratio()
+            if score < cutoff:
+                continue
+            if len(best) < n:
+                heapq.heappush(best, (score, name))
+            else:
+                heapq.heappushpop(best, (score, name))
+
+        matches = [name for _, name in sorted(best, reverse=True)]
+        self._matches[key] = matches
+        return matches
+
+    def best_match(self, family, cutoff=0.6):
+        """Returns the family name difflib.get_close_matches would list first, or None."""
+        matches = self.get_close_matches(family, 1, cutoff)
+        return matches[0] if matches else None
+
+
+family_matchers = {}
+
+
+def load_route_manifest(path=None):
+    """Loads the compiled route manifest at path or $VBR_ROUTE_MANIFEST; returns None when none has been built."""
+    path = path or os.environ.get("VBR_ROUTE_MANIFEST") or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "route_manifest.json")
+    try:
+        with open(path) as manifest_file:
+            manifest = json.load(manifest_file)
+    except FileNotFoundError:
+        return None
+    except ValueError as e:
+        print("Ignoring invalid route manifest '{}': {}.".format(path, e))
+        return None
+    return manifest.get("versions")
+
+
+route_manifest = load_route_manifest()
+manifest_method_indexes = {}
+
+
+class MethodIndex:
+    """Ranked hint lookup over a class's methods: exact, then name prefix, then token prefix, then substring."""
+
+    def __init__(self, methods):
+        self.methods = sorted(set(methods))
+        self._names = set(self.methods)
+        # Every suffix of a method name that starts at a '_' token boundary, sorted for prefix search
+        self._token_suffixes = sorted(
+            (method[start:], method)
+            for method in self.methods
+            for start in [0] + [i + 1 for i, char in enumerate(method) if char == "_"]
+        )
+        self._suffix_keys = [suffix for suffix, _ in self._token_suffixes]
+        self._best = {}
+
+    @staticmethod
+    def _rank(method):
+        return (len(method), method)
+
+    def _name_prefix_matches(self, hint):
+        matches = []
+        for index in range(bisect.bisect_left(self.methods, hint), len(self.methods)):
+            if not self.methods[index].startswith(hint):
+                break
+            matches.append(self.methods[index])
+        return matches
+
+    def _token_prefix_matches(self, hint):
+        matches = set()
+        for index in range(bisect.bisect_left(self._suffix_keys, hint), len(self._suffix_keys)):
+            if not self._suffix_keys[index].startswith(hint):
+                break
+            matches.add(self._token_suffixes[index][1])
+        return matches
+
+    def _tiers(self, hint):
+        yield [hint] if hint in self._names else []
+        yield self._name_prefix_matches(hint)
+        yield self._token_prefix_matches(hint)
+        yield [method for method in self.methods if hint in method]
+
+    def best(self, hint):
+        """Returns the best method for the hint, or None. Only falls back to a linear scan when no prefix matches."""
+        if hint not in self._best:
+            match = None
+            for tier in self._tiers(hint):
+                if tier:
+                    match = min(tier, key=self._rank)
+                    break
+            self._best[hint] = match
+        return self._best[hint]
+
+    def search(self, hint):
+        """Returns every method containing the hint, best match first."""
+        ranked = []
+        seen = set()
+        for tier in self._tiers(hint):
+            for method in sorted(set(tier) - seen, key=self._rank):
+                ranked.append(method)
+                seen.add(method)
+        return ranked
+
+
+method_indexes = {}
+
+
+defined_methods = weakref.WeakKeyDictionary()
 
 
 def list_defined_methods(cls_obj):
-    """Lists all methods of a given class."""
-    methods = []
-    
-    # Iterate over all members of the class
-    for name, obj in inspect.getmembers(cls_obj, inspect.isfunction):
-        print(name, obj)
-        # Check if the function is defined in the class's module
-        if obj.__module__ == cls_obj.__module__:
-            # If it is, add the method name to the methods list
-            methods.append(name)
-    
-    return methods
+    """Lists all methods of a given class, reading the class __dict__s along the MRO instead of inspect.getmembers."""
+    methods = defined_methods.get(cls_obj)
+    if methods is None:
+        members = {}
+        for klass in cls_obj.__mro__:
+            for name, obj in vars(klass).items():
+                # The first class in the MRO wins, as with getattr
+                members.setdefault(name, obj)
+
+        methods = []
+        for name in sorted(members):
+            obj = members[name]
+            # getattr unwraps static methods to plain functions
+            if isinstance(obj, staticmethod):
+                obj = obj.__func__
+            # Check if the function is defined in the class's module
+            if isinstance(obj, types.FunctionType) and obj.__module__ == cls_obj.__module__:
+                methods.append(name)
+
+        # Family classes don't change once imported, so the scan is cached per class
+        methods = tuple(methods)
+        defined_methods[cls_obj] = methods
+
+    return list(methods)
 
 def format_version(version):
     """Converts version from '2.3.5.3' to 'v2_3_5_3'."""
@@ -30,10 +451,15 @@ def validate_version(version):
 
 def find_closest_family(module, family):
     """Finds the closest matching family name from available modules."""
-    available_families = get_available_families(module)
-    closest_matches = difflib.get_close_matches(family, available_families)
-    if closest_matches:
-        return closest_matches[0]
+    return get_family_matcher(module).best_match(family)
+
+def get_family_matcher(module):
+    """Gets the family matcher for a version module, building it on first use."""
+    matcher = family_matchers.get(module.__name__)
+    if matcher is None:
+        matcher = FamilyMatcher(get_available_families(module))
+        family_matchers[module.__name__] = matcher
+    return matcher
 
 def get_available_families(module):
     """Gets the names of all modules available in the given module's directory."""
@@ -59,32 +485,71 @@ def try_import_module(version, family):
         raise ImportError("Module for version '{}' not found: {}.".format(version, e))
 
 def filter_methods_by_hint(methods, hint):
-    """Filters methods to include only those containing the hint in their name."""
-    matching_methods = []
-    
-    # Iterate over each method name in the methods list
-    for method in methods:
-        # Check if the hint is a substring of the method name
-        if hint in method:
-            # If it is, add the method name to the matching_methods list
-            matching_methods.append(method)
-    
-    return matching_methods
+    """Filters methods to include only those containing the hint in their name, best match first."""
+    if not isinstance(methods, MethodIndex):
+        methods = MethodIndex(methods)
+    return methods.search(hint)
+
+def get_method_index(cls_obj):
+    """Gets the method index for a family class, building it on first use."""
+    index = method_indexes.get(cls_obj)
+    if index is None:
+        index = MethodIndex(list_defined_methods(cls_obj))
+        method_indexes[cls_obj] = index
+    return index
 
 def get_class_names(module):
-    """Gets the names of all classes defined in the given module."""
+    """Gets the names of all classes defined in the given module, sorted, from the module __dict__."""
     class_names = []
     
     # Iterate over all members of the module
-    for name, obj in inspect.getmembers(module, inspect.isclass):
-        # Check if the class is defined in the given module
-        if obj.__module__ == module.__name__:
+    for name, obj in vars(module).items():
+        # Check if the member is a class defined in the given module
+        if isinstance(obj, type) and obj.__module__ == module.__name__:
             class_names.append(name)
     
-    return class_names
+    return sorted(class_names)
+
+def resolve_from_manifest(version, family, hint):
+    """Resolves a route from the compiled manifest without importing the SDK, with the same family and hint matching."""
+    families = route_manifest.get(version)
+    matcher = family_matchers.get(("manifest", version))
+    if matcher is None:
+        matcher = FamilyMatcher(families)
+        family_matchers[("manifest", version)] = matcher
+
+    family_name = matcher.best_match(family)
+    if family_name is None:
+        print("Family '{}' not found in the route manifest for version '{}'.".format(family, version))
+        return None
+
+    index = manifest_method_indexes.get((version, family_name))
+    if index is None:
+        index = MethodIndex(families[family_name].values())
+        manifest_method_indexes[(version, family_name)] = index
+    return index.best(hint)
 
 def call_function(version, family, hint):
     """Checks if a specific function exists in the first class found in the module."""
+    function_name = route_table.get(version, family, hint)
+    if function_name is not None:
+        return function_name
+
+    if persistent_route_cache is not None:
+        function_name = persistent_route_cache.get(version, family, hint)
+        if function_name is not None:
+            route_table.put(version, family, hint, function_name)
+            return function_name
+
+    # Versions in the compiled manifest are served from it; only the others import the SDK
+    if route_manifest and version in route_manifest:
+        function_name = resolve_from_manifest(version, family, hint)
+        if function_name:
+            route_table.put(version, family, hint, function_name)
+        else:
+            print("No matching function for hint '{}' in version '{}'.".format(hint, version))
+        return function_name
+
     try:
         validate_version(version)
         module = try_import_module(version, family)
@@ -94,12 +559,14 @@ def call_function(version, family, hint):
         class_names = get_class_names(module)
         if class_names:
             family_class = getattr(module, class_names[0])
-            methods = list_defined_methods(family_class)#
-            matching_methods = filter_methods_by_hint(methods, hint)
+            function_name = get_method_index(family_class).best(hint)
 
-            if matching_methods:
-                print("Yes, function '{}' is available.".format(matching_methods[0]))
-                return matching_methods[0]  # Return the matched function name
+            if function_name:
+                print("Yes, function '{}' is available.".format(function_name))
+                route_table.put(version, family, hint, function_name)
+                if persistent_route_cache is not None:
+                    persistent_route_cache.put(version, family, hint, function_name)
+                return function_name  # Return the matched function name
             else:
                 print("No matching function for hint '{}' in version '{}'.".format(hint, version))
                 return None
@@ -111,6 +578,86 @@ def call_function(version, family, hint):
         return None
 
 
+def format_version_name(version_module_name):
+    """Converts a version package name from 'v2_3_5_3' to '2.3.5.3'."""
+    return version_module_name[1:].replace("_", ".")
+
+def canonical_function_key(method_name):
+    """Converts an SDK method name such as 'add_and_update_a_a_attribute_ap_i' to 'add_and_update_aa_attribute'."""
+    name = re.sub(r"_(api|ap_i)$", "", method_name)
+    tokens = []
+    initials = ""
+
+    # Join runs of single letters ('a_a') back into the acronym they came from ('aa')
+    for token in name.split("_"):
+        if len(token) == 1:
+            initials += token
+            continue
+        if initials:
+            tokens.append(initials)
+            initials = ""
+        tokens.append(token)
+    if initials:
+        tokens.append(initials)
+
+    return "_".join(tokens)
+
+def get_available_versions():
+    """Gets the API versions shipped with the installed dnacentersdk."""
+    api_module = importlib.import_module("dnacentersdk.api")
+    versions = []
+    for _, name, is_package in pkgutil.iter_modules(api_module.__path__):
+        if is_package and re.match(r"^v\d+(_\d+)+$", name):
+            versions.append(format_version_name(name))
+    return sorted(versions)
+
+def compile_version_routes(version):
+    """Builds the family -> canonical key -> method name table for one API version."""
+    module_path = "dnacentersdk.api.{}".format(format_version(version))
+    base_module = importlib.import_module(module_path)
+    families = {}
+
+    for family in get_available_families(base_module):
+        module = importlib.import_module("{}.{}".format(module_path, family))
+        class_names = get_class_names(module)
+        if not class_names:
+            continue
+
+        family_class = getattr(module, class_names[0])
+        routes = {}
+        for method in list_defined_methods(family_class):
+            if not method.startswith("_"):
+                routes[canonical_function_key(method)] = method
+        families[family] = routes
+
+    return families
+
+def compile_route_manifest(path, versions=None):
+    """Walks every SDK version once and writes the version -> family -> key -> method manifest to path."""
+    if versions is None:
+        versions = get_available_versions()
+
+    manifest = {
+        "format": 1,
+        "versions": {version: compile_version_routes(version) for version in versions},
+    }
+    with open(path, "w") as manifest_file:
+        json.dump(manifest, manifest_file, sort_keys=True, separators=(",", ":"))
+
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Version based routing for dnacentersdk.")
+    parser.add_argument("--build-manifest", metavar="PATH",
+                        help="snapshot every installed SDK version into a route manifest at PATH")
+    parser.add_argument("--version", action="append", dest="versions",
+                        help="limit the manifest to this API version (repeatable)")
+    args = parser.parse_args()
 
-function_called = call_function('2.3.5.3', 'user_and role', 'add_user')
-print(function_called)  # Expected output: add_user_ap_i
\ No newline at end of file
+    if args.build_manifest:
+        manifest = compile_route_manifest(args.build_manifest, args.versions)
+        print("Wrote {} versions to {}".format(len(manifest["versions"]), args.build_manifest))
+    else:
+        function_called = call_function('2.3.5.3', 'user_and role', 'add_user')
+        print(function_called)  # Expected output: add_user_ap_i